@@ -0,0 +1,49 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _render(view, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        if response.streaming:
+            response = _buffer(response)
+        return response
+    finally:
+        close_old_connections()
+
+
+def _buffer(response):
+    buffered = HttpResponse(b''.join(response.streaming_content),
+                            status=response.status_code)
+    for header, value in response.items():
+        buffered[header] = value
+    return buffered
+
+
+def async_read_view(view):
+    read = sync_to_async(_render, thread_sensitive=False)
+    write = sync_to_async(view)
+
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await read(view, request, *args, **kwargs)
+        return await write(request, *args, **kwargs)
+
+    return wrapped
+
+
+def async_read_urls(urlpatterns, names):
+    for pattern in urlpatterns:
+        if getattr(pattern, 'name', None) in names:
+            pattern.callback = async_read_view(pattern.callback)
+    return urlpatterns
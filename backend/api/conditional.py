@@ -0,0 +1,60 @@
+import hashlib
+from datetime import datetime, timezone
+
+from django.db import DatabaseError
+from django.views.decorators.http import condition
+
+from recipes.models import Recipe
+from recipes.versions import (INGREDIENTS, TAGS, get_versions, profile_key,
+                              recipe_key, viewer_key)
+
+
+def tags_versions(request, **kwargs):
+    return [TAGS]
+
+
+def ingredients_versions(request, **kwargs):
+    return [INGREDIENTS]
+
+
+def recipe_versions(request, pk, **kwargs):
+    if not str(pk).isdigit():
+        return None
+    try:
+        author_id = Recipe.objects.filter(
+            pk=pk, is_hidden=False).values_list('author_id', flat=True).first()
+    except DatabaseError:
+        return None
+    if author_id is None:
+        return None
+    names = [TAGS, INGREDIENTS, recipe_key(pk), profile_key(author_id)]
+    if not request.user.is_anonymous:
+        names.append(viewer_key(request.user.pk))
+    return names
+
+
+def _versions(request, get_names, kwargs):
+    if not hasattr(request, '_data_versions'):
+        names = get_names(request, **kwargs)
+        request._data_versions = names and get_versions(*names)
+    return request._data_versions
+
+
+def versioned(get_names):
+    def etag(request, *args, **kwargs):
+        versions = _versions(request, get_names, kwargs)
+        if not versions:
+            return None
+        viewer = None if request.user.is_anonymous else request.user.pk
+        digest = hashlib.md5(repr(
+            (request.get_full_path(), viewer, versions)
+        ).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def last_modified(request, *args, **kwargs):
+        versions = _versions(request, get_names, kwargs)
+        if not versions:
+            return None
+        return datetime.fromtimestamp(max(versions), tz=timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
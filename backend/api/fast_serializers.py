@@ -0,0 +1,101 @@
+from django.core.files.storage import default_storage
+
+from api.serializers import rendition_urls
+from recipes.cache import get_ingredients_by_id, get_tags_by_id
+from recipes.snapshots import refresh_snapshots
+from recipes.viewer import CART, FAVORITES, FOLLOWS, get_viewer_context
+
+
+RECIPE_FIELDS = ('id', 'tags', 'author', 'ingredients', 'name', 'image',
+                 'renditions', 'cooking_time', 'text', 'is_favorited',
+                 'is_in_shopping_cart')
+RECIPE_COLUMNS = {
+    'tags': ('snapshot',),
+    'author': ('snapshot',),
+    'ingredients': ('snapshot',),
+    'name': ('name',),
+    'image': ('image',),
+    'renditions': ('image_renditions',),
+    'cooking_time': ('cooking_time',),
+    'text': ('text',),
+}
+AUTHOR_KEYS = ('email', 'id', 'username', 'first_name', 'last_name')
+
+
+def recipe_values(fields=RECIPE_FIELDS):
+    columns = ['id']
+    for name in fields:
+        for column in RECIPE_COLUMNS.get(name, ()):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+class FastRecipeSerializer:
+
+    def __init__(self, rows, context, fields=RECIPE_FIELDS):
+        self.rows = list(rows)
+        self.request = context['request']
+        self.fields = fields
+
+    @property
+    def data(self):
+        self.fill_missing_snapshots()
+        getters = {
+            'id': lambda row: row['id'],
+            'name': lambda row: row['name'],
+            'image': lambda row: self.get_image(row['image']),
+            'renditions': lambda row: rendition_urls(
+                self.request, row['image_renditions']),
+            'cooking_time': lambda row: row['cooking_time'],
+            'text': lambda row: row['text'],
+        }
+        if 'tags' in self.fields:
+            tags = get_tags_by_id()
+            getters['tags'] = lambda row: [
+                tags[tag_id] for tag_id in row['snapshot']['tags']
+                if tag_id in tags]
+        if 'author' in self.fields:
+            followed = get_viewer_context(self.request.user)[FOLLOWS]
+            getters['author'] = lambda row: self.get_author(
+                row['snapshot']['author'], followed)
+        if 'ingredients' in self.fields:
+            ingredients = get_ingredients_by_id()
+            getters['ingredients'] = lambda row: [
+                {
+                    'id': ingredient_id,
+                    'amount': amount,
+                    'name': ingredients[ingredient_id][0],
+                    'measurement_unit': ingredients[ingredient_id][1],
+                }
+                for ingredient_id, amount in row['snapshot']['ingredients']
+                if ingredient_id in ingredients
+            ]
+        if 'is_favorited' in self.fields:
+            favorited = get_viewer_context(self.request.user)[FAVORITES]
+            getters['is_favorited'] = lambda row: row['id'] in favorited
+        if 'is_in_shopping_cart' in self.fields:
+            in_cart = get_viewer_context(self.request.user)[CART]
+            getters['is_in_shopping_cart'] = lambda row: row['id'] in in_cart
+        getters = [(name, getters[name]) for name in self.fields]
+        return [{name: getter(row) for name, getter in getters}
+                for row in self.rows]
+
+    def fill_missing_snapshots(self):
+        missing = [row['id'] for row in self.rows
+                   if 'snapshot' in row and not row['snapshot']]
+        if missing:
+            snapshots = refresh_snapshots(missing)
+            for row in self.rows:
+                if row['id'] in snapshots:
+                    row['snapshot'] = snapshots[row['id']]
+
+    def get_image(self, name):
+        if not name:
+            return None
+        return self.request.build_absolute_uri(default_storage.url(name))
+
+    def get_author(self, values, followed):
+        author = dict(zip(AUTHOR_KEYS, values))
+        author['is_subscribed'] = author['id'] in followed
+        return author
@@ -0,0 +1,35 @@
+def _split(value):
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request, available):
+    fields = _split(request.query_params.get('fields'))
+    omit = _split(request.query_params.get('omit'))
+    return tuple(name for name in available
+                 if (not fields or name in fields) and name not in omit)
+
+
+class SparseFieldsSerializerMixin:
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+
+    def get_requested_fields(self, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        return requested_fields(self.request,
+                                serializer_class.Meta.fields)
+
+    def get_serializer(self, *args, **kwargs):
+        if (self.request.method == 'GET'
+                and issubclass(self.get_serializer_class(),
+                               SparseFieldsSerializerMixin)):
+            kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
@@ -1,16 +1,18 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Tag, Recipe
+from recipes.cache import get_tag_ids_by_slug, tag_slug_choices
+from recipes.models import Recipe
+from recipes.viewer import CART, FAVORITES, get_viewer_context
 
 
 User = get_user_model()
 
 
 class RecipeFilter(FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(field_name='tags__slug',
-                                             to_field_name='slug',
-                                             queryset=Tag.objects.all())
+    tags = filters.MultipleChoiceFilter(choices=tag_slug_choices,
+                                        method='tags_method')
     author = filters.ModelChoiceFilter(
         queryset=User.objects.all(),
     )
@@ -23,12 +25,20 @@ class RecipeFilter(FilterSet):
         model = Recipe
         fields = ('author', 'tags')
 
+    def tags_method(self, queryset, name, value):
+        tag_ids_by_slug = get_tag_ids_by_slug()
+        tag_ids = [tag_ids_by_slug[slug] for slug in value
+                   if slug in tag_ids_by_slug]
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(recipe_id=OuterRef('pk'),
+                                               tag_id__in=tag_ids)))
+
     def is_favorited_method(self, queryset, name, value):
         user = self.request.user
         if user.is_anonymous:
             return Recipe.objects.none()
         if value:
-            return queryset.filter(favored_by__user=user)
+            return queryset.filter(pk__in=get_viewer_context(user)[FAVORITES])
         return queryset
 
     def is_in_shopping_cart_method(self, queryset, name, value):
@@ -36,5 +46,5 @@ class RecipeFilter(FilterSet):
         if user.is_anonymous:
             return Recipe.objects.none()
         if value:
-            return queryset.filter(carts__user=user)
+            return queryset.filter(pk__in=get_viewer_context(user)[CART])
         return queryset
@@ -0,0 +1,66 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand, CommandError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.fast_serializers import FastRecipeSerializer, recipe_values
+from api.renderers import dumps
+from api.serializers import ShowingRecipeSerializer
+from recipes.models import Recipe
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость FastRecipeSerializer и '
+            'ShowingRecipeSerializer на странице рецептов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100,
+                            help='Сколько рецептов сериализовать за раз.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--viewer',
+                            help='username пользователя, от имени которого '
+                                 'строится выдача; по умолчанию аноним.')
+
+    def handle(self, *args, **options):
+        user = AnonymousUser()
+        if options['viewer']:
+            user = User.objects.filter(username=options['viewer']).first()
+            if user is None:
+                raise CommandError('Пользователь не найден.')
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        context = {'request': request}
+        queryset = Recipe.objects.filter(
+            is_hidden=False).order_by('-pub_date')[:options['limit']]
+        if not queryset.exists():
+            raise CommandError('Нет рецептов для замера.')
+
+        def fast():
+            return dumps(FastRecipeSerializer(
+                queryset.values(*recipe_values()), context=context).data)
+
+        def slow():
+            return dumps(ShowingRecipeSerializer(
+                queryset, many=True, context=context).data)
+
+        if fast() != slow():
+            raise CommandError('Ответы сериализаторов различаются.')
+        results = {}
+        for name, render in (('ShowingRecipeSerializer', slow),
+                             ('FastRecipeSerializer', fast)):
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                render()
+            results[name] = (time.perf_counter()
+                             - started) / options['repeat']
+            print(f'{name}: {results[name] * 1000:.1f} мс на страницу')
+        speedup = (results['ShowingRecipeSerializer']
+                   / results['FastRecipeSerializer'])
+        print(f'Ускорение: {speedup:.1f}x')
+        print('Готово!')
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from api.precompressed import PAYLOADS, rebuild_precompressed
+
+
+class Command(BaseCommand):
+
+    def handle(self, *args, **options):
+        for name in PAYLOADS:
+            bodies = rebuild_precompressed(name)
+            sizes = ', '.join(f'{encoding} {len(body)}'
+                              for encoding, body in bodies.items())
+            print(f'{name}: {sizes}')
+        print('Готово!')
@@ -0,0 +1,248 @@
+import asyncio
+import json
+import random
+import ssl
+import time
+from collections import defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand
+
+from recipes.models import Ingredient, Recipe, Tag
+
+
+User = get_user_model()
+
+PASSWORD = 'loadtest-password'
+PAGE_SIZE = 6
+MAX_BROWSE_PAGE = 5
+STEPS = (
+    ('browse', 30),
+    ('recipe_detail', 15),
+    ('tag_filter', 12),
+    ('ingredient_search', 15),
+    ('login', 3),
+    ('favorite_toggle', 10),
+    ('cart_toggle', 10),
+    ('download_cart', 5),
+)
+
+
+class HttpClient:
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if (
+            url.scheme == 'https') else None
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, token=None, data=None):
+        if self.writer is None:
+            await self.connect()
+        body = json.dumps(data).encode() if data is not None else b''
+        headers = [f'{method} {path} HTTP/1.1', f'Host: {self.host}',
+                   'Accept-Encoding: identity',
+                   f'Content-Length: {len(body)}']
+        if data is not None:
+            headers.append('Content-Type: application/json')
+        if token:
+            headers.append(f'Authorization: Token {token}')
+        self.writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode() + body)
+        await self.writer.drain()
+        try:
+            return await self.read_response()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            await self.close()
+            raise
+
+    async def read_response(self):
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(
+                int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await self.reader.readline()
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+        else:
+            body = await self.reader.read()
+            await self.close()
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, body
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест: смешанный сценарий против запущенного сервера.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument('--users', type=int, default=20,
+                            help='Сколько тестовых аккаунтов создать.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.emails = self.seed_accounts(options['users'])
+        self.recipe_ids = list(Recipe.objects.filter(
+            is_hidden=False).values_list('id', flat=True))
+        self.browse_pages = min(MAX_BROWSE_PAGE,
+                                -(-len(self.recipe_ids) // PAGE_SIZE))
+        self.tag_slugs = list(Tag.objects.values_list('slug', flat=True))
+        self.prefixes = sorted({
+            name[:2].lower() for name in
+            Ingredient.objects.values_list('name', flat=True)[:2000]})
+        if not (self.recipe_ids and self.tag_slugs and self.prefixes):
+            self.stderr.write('Нужны рецепты, теги и ингредиенты в базе.')
+            return
+        self.stats = defaultdict(list)
+        self.errors = defaultdict(int)
+        started = time.monotonic()
+        asyncio.run(self.run(options))
+        self.report(time.monotonic() - started)
+
+    def seed_accounts(self, count):
+        emails = [f'loadtest{i}@example.com' for i in range(count)]
+        existing = set(User.objects.filter(email__in=emails).values_list(
+            'email', flat=True))
+        password = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(username=email, email=email,
+                 first_name='Load', last_name='Test', password=password)
+            for email in emails if email not in existing
+        ])
+        return emails
+
+    async def run(self, options):
+        deadline = time.monotonic() + options['duration']
+        await asyncio.gather(*(
+            self.client(options['base_url'], index, deadline)
+            for index in range(options['concurrency'])
+        ))
+
+    async def client(self, base_url, index, deadline):
+        http = HttpClient(base_url)
+        email = self.emails[index % len(self.emails)]
+        token = await self.login(http, email)
+        names = [name for name, _ in STEPS]
+        weights = [weight for _, weight in STEPS]
+        while time.monotonic() < deadline:
+            step = random.choices(names, weights)[0]
+            if step == 'login':
+                token = await self.login(http, email) or token
+                continue
+            await getattr(self, step)(http, token)
+        await http.close()
+
+    async def timed(self, step, http, method, path, token=None, data=None,
+                    ok=(200, 201, 204)):
+        started = time.monotonic()
+        try:
+            status, body = await http.request(method, path, token, data)
+        except (OSError, asyncio.IncompleteReadError, ValueError,
+                IndexError):
+            status, body = None, b''
+        self.stats[step].append(time.monotonic() - started)
+        if status not in ok:
+            self.errors[step] += 1
+        return status, body
+
+    async def login(self, http, email):
+        status, body = await self.timed(
+            'login', http, 'POST', '/api/auth/token/login/',
+            data={'email': email, 'password': PASSWORD})
+        if status == 200:
+            return json.loads(body)['auth_token']
+        return None
+
+    async def browse(self, http, token):
+        page = random.randint(1, self.browse_pages)
+        await self.timed('browse', http, 'GET',
+                         f'/api/recipes/?page={page}&limit={PAGE_SIZE}')
+
+    async def recipe_detail(self, http, token):
+        recipe_id = random.choice(self.recipe_ids)
+        await self.timed('recipe_detail', http, 'GET',
+                         f'/api/recipes/{recipe_id}/', token)
+
+    async def tag_filter(self, http, token):
+        tags = random.sample(self.tag_slugs,
+                             random.randint(1, min(3, len(self.tag_slugs))))
+        query = urlencode([('limit', PAGE_SIZE)]
+                          + [('tags', tag) for tag in tags])
+        await self.timed('tag_filter', http, 'GET', f'/api/recipes/?{query}',
+                         token)
+
+    async def ingredient_search(self, http, token):
+        query = urlencode({'name': random.choice(self.prefixes)})
+        await self.timed('ingredient_search', http, 'GET',
+                         f'/api/ingredients/?{query}')
+
+    async def toggle(self, step, action, http, token):
+        path = f'/api/recipes/{random.choice(self.recipe_ids)}/{action}/'
+        status, _ = await self.timed(step, http, 'POST', path, token,
+                                     ok=(201, 400))
+        if status == 400:
+            await self.timed(step, http, 'DELETE', path, token)
+
+    async def favorite_toggle(self, http, token):
+        await self.toggle('favorite_toggle', 'favorite', http, token)
+
+    async def cart_toggle(self, http, token):
+        await self.toggle('cart_toggle', 'shopping_cart', http, token)
+
+    async def download_cart(self, http, token):
+        await self.timed('download_cart', http, 'GET',
+                         '/api/recipes/download_shopping_cart/', token)
+
+    def report(self, elapsed):
+        total = sum(len(times) for times in self.stats.values())
+        errors = sum(self.errors.values())
+        self.stdout.write(
+            f'{total} запросов за {elapsed:.1f} с: '
+            f'{total / elapsed:.1f} req/s, ошибок {errors} '
+            f'({errors / max(total, 1):.2%})')
+        self.stdout.write(
+            f'{"шаг":<18}{"req":>7}{"req/s":>9}{"err %":>8}'
+            f'{"p50 ms":>9}{"p90 ms":>9}{"p99 ms":>9}{"max ms":>9}')
+        for step, _ in STEPS:
+            times = sorted(self.stats.get(step, []))
+            if not times:
+                continue
+
+            def percentile(value):
+                return times[min(len(times) - 1,
+                                 int(len(times) * value))] * 1000
+
+            self.stdout.write(
+                f'{step:<18}{len(times):>7}{len(times) / elapsed:>9.1f}'
+                f'{self.errors[step] / len(times):>8.2%}'
+                f'{percentile(0.5):>9.1f}{percentile(0.9):>9.1f}'
+                f'{percentile(0.99):>9.1f}{times[-1] * 1000:>9.1f}')
@@ -0,0 +1,42 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from foodgram.db_router import (has_recent_write, mark_recent_write,
+                                restore_replica, use_replica)
+
+
+class ReplicaReadMixin:
+
+    def dispatch(self, request, *args, **kwargs):
+        token = use_replica(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            restore_replica(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (request.method in SAFE_METHODS
+                and not has_recent_write(request.user)):
+            use_replica(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response,
+                                             *args, **kwargs)
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            mark_recent_write(request.user)
+        return response
+
+
+class ThrottleHeadersMixin:
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response,
+                                             *args, **kwargs)
+        quota = getattr(request, 'throttle_quota', None)
+        if quota is not None:
+            limit, remaining = quota
+            response['X-RateLimit-Limit'] = limit
+            response['X-RateLimit-Remaining'] = remaining
+        return response
@@ -1,6 +1,126 @@
+import hashlib
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from api.singleflight import single_flight
+from recipes.versions import get_versions
+
+
+COUNT_CACHE_TIMEOUT = 300
+PAGE_CACHE_TIMEOUT = 60
+
+
+def query_signature(queryset, versions):
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    signature = repr((queryset.db, sql, params, get_versions(*versions)))
+    return hashlib.md5(signature.encode()).hexdigest()
+
+
+def where_sql(queryset):
+    compiler = queryset.query.get_compiler(queryset.db)
+    try:
+        return compiler.compile(queryset.query.where)
+    except EmptyResultSet:
+        return None
+
+
+def estimated_count(queryset, base_queryset=None):
+    threshold = settings.PAGINATION_ESTIMATE_THRESHOLD
+    connection = connections[queryset.db]
+    if not threshold or connection.vendor != 'postgresql':
+        return None
+    if queryset.query.has_filters() and (
+            base_queryset is None
+            or where_sql(queryset) != where_sql(base_queryset)):
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < threshold:
+        return None
+    return int(row[0])
+
+
+class CachedCountPaginator(Paginator):
+
+    def __init__(self, object_list, per_page, count_versions=(),
+                 page_versions=(), base_queryset=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.base_queryset = base_queryset
+        self.count_versions = count_versions
+        self.page_versions = page_versions
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        estimate = estimated_count(self.object_list, self.base_queryset)
+        if estimate is not None:
+            self.count_is_estimate = True
+            return estimate
+        key = self.count_cache_key()
+        if key is None:
+            return super().count
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+    def count_cache_key(self):
+        if not self.count_versions:
+            return None
+        signature = query_signature(self.object_list.order_by().values('pk'),
+                                    self.count_versions)
+        return signature and f'count:{signature}'
+
+    def page(self, number):
+        page = super().page(number)
+        object_list = page.object_list
+        if self.page_versions and hasattr(object_list, 'query'):
+            signature = query_signature(object_list, self.page_versions)
+            if signature is not None:
+                page.object_list = single_flight(
+                    f'page:{signature}', lambda: list(object_list),
+                    PAGE_CACHE_TIMEOUT)
+        return page
 
 
 class CustomPaginator(PageNumberPagination):
     page_size_query_param = 'limit'
     ordering = ['-pub_date']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        get_count_versions = getattr(view, 'get_count_versions', None)
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            count_versions=get_count_versions() if get_count_versions else (),
+            page_versions=getattr(view, 'page_versions', ()),
+            base_queryset=(view.get_queryset()
+                           if hasattr(view, 'get_queryset') else None))
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_estimate', paginator.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
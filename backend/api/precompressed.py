@@ -0,0 +1,81 @@
+import gzip
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from api.renderers import dumps
+from api.singleflight import single_flight
+from recipes.models import Ingredient, Tag
+from recipes.versions import INGREDIENTS, TAGS, get_versions
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PRECOMPRESSED_TIMEOUT = 24 * 60 * 60
+ENCODINGS = ('br', 'gzip')
+
+
+def build_tags():
+    return dumps(list(Tag.objects.values('id', 'slug', 'name', 'color')))
+
+
+def build_ingredients():
+    return dumps(list(Ingredient.objects.values(
+        'id', 'name', 'measurement_unit')))
+
+
+PAYLOADS = {
+    'tags': (TAGS, build_tags),
+    'ingredients': (INGREDIENTS, build_ingredients),
+}
+
+_local = {}
+
+
+def encode(body):
+    bodies = {'identity': body, 'gzip': gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(body, quality=11)
+    return bodies
+
+
+def _cache_key(name, version):
+    return f'precompressed:{name}:{version}'
+
+
+def get_precompressed(name):
+    version_name, build = PAYLOADS[name]
+    version, = get_versions(version_name)
+    entry = _local.get(name)
+    if entry is None or entry[0] != version:
+        entry = (version, single_flight(_cache_key(name, version),
+                                        lambda: encode(build()),
+                                        PRECOMPRESSED_TIMEOUT))
+        _local[name] = entry
+    return entry[1]
+
+
+def rebuild_precompressed(name):
+    version_name, _ = PAYLOADS[name]
+    version, = get_versions(version_name)
+    cache.delete(_cache_key(name, version))
+    _local.pop(name, None)
+    return get_precompressed(name)
+
+
+def precompressed_response(request, name):
+    bodies = get_precompressed(name)
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = next((encoding for encoding in ENCODINGS
+                     if encoding in bodies and encoding in accepted),
+                    'identity')
+    response = HttpResponse(bodies[encoding],
+                            content_type='application/json')
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
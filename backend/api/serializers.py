@@ -1,8 +1,11 @@
 import base64
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import serializers
 
+from api.fieldsets import SparseFieldsSerializerMixin
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from recipes.models import (
     Ingredient,
@@ -11,6 +14,12 @@ from recipes.models import (
     ShoppingCart,
     Tag,
 )
+from recipes.cache import get_ingredient, get_ingredients_by_id, get_tag
+from recipes.catalog import bulk_insert_recipes
+from recipes.images import (MAX_IMAGE_SIZE, inspect_image,
+                            schedule_renditions, store_image)
+from recipes.versions import RECIPE_ROWS, RECIPES, bump_version_on_commit
+from recipes.viewer import CART, FAVORITES, FOLLOWS, get_viewer_context
 
 
 User = get_user_model()
@@ -18,6 +27,7 @@ User = get_user_model()
 
 MIN_AMOUNT_OR_COOKING_TIME = 1
 MAX_AMOUNT_OR_COOKING_TIME = 32000
+BULK_BATCH_SIZE = 100
 
 
 class Base64ImageField(serializers.ImageField):
@@ -26,10 +36,63 @@ class Base64ImageField(serializers.ImageField):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
+            if len(imgstr) * 3 // 4 > MAX_IMAGE_SIZE:
+                raise serializers.ValidationError(
+                    f'Размер изображения не должен превышать '
+                    f'{MAX_IMAGE_SIZE // (1024 * 1024)} МБ')
 
             data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
 
-        return super().to_internal_value(data)
+        image = super().to_internal_value(data)
+        try:
+            image.image_ext = inspect_image(image)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        return image
+
+
+def save_image(image):
+    if not image or isinstance(image, str):
+        return image
+    return store_image(image, image.image_ext, getattr(image, 'sha256', None))
+
+
+class RenditionsField(serializers.ReadOnlyField):
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'image_renditions')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return rendition_urls(self.context.get('request'), value)
+
+
+def rendition_urls(request, renditions):
+    urls = {}
+    for rendition, names in (renditions or {}).items():
+        urls[rendition] = {}
+        for fmt, name in names.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[rendition][fmt] = url
+    return urls
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+
+    def __init__(self, get_object, **kwargs):
+        self.get_object = get_object
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            obj = self.get_object(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -48,7 +111,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ShowUserSerializer(UserSerializer):
+class ShowUserSerializer(SparseFieldsSerializerMixin, UserSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -58,15 +121,15 @@ class ShowUserSerializer(UserSerializer):
 
     def get_is_subscribed(self, obj):
         request = self.context['request']
-        if request and not request.user.is_anonymous:
-            return obj.following.filter(user=request.user).exists()
-        return False
+        return bool(request) and obj.pk in get_viewer_context(
+            request.user)[FOLLOWS]
 
 
 class RecipeIngredientSerializer(serializers.ModelSerializer):
 
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all(),
-                                            source='ingredient.id')
+    id = CachedPrimaryKeyRelatedField(get_ingredient,
+                                      queryset=Ingredient.objects.all(),
+                                      source='ingredient.id')
     name = serializers.CharField(
         read_only=True,
         source='ingredient.name'
@@ -90,6 +153,18 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         model = RecipeIngredient
         fields = ('id', 'amount', 'name', 'measurement_unit',)
 
+    def to_representation(self, instance):
+        ingredient = get_ingredients_by_id().get(instance.ingredient_id)
+        if ingredient is None:
+            return super().to_representation(instance)
+        name, measurement_unit = ingredient
+        return {
+            'id': instance.ingredient_id,
+            'amount': instance.amount,
+            'name': name,
+            'measurement_unit': measurement_unit,
+        }
+
 
 class ShowingRecipeSerializer(serializers.ModelSerializer):
     author = ShowUserSerializer(read_only=True)
@@ -98,6 +173,7 @@ class ShowingRecipeSerializer(serializers.ModelSerializer):
         many=True,
         source='recipe_recipe_ingredients')
     image = Base64ImageField(required=False, allow_null=True)
+    renditions = RenditionsField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
 
@@ -105,20 +181,18 @@ class ShowingRecipeSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'name', 'image',
-            'cooking_time',
+            'renditions', 'cooking_time',
             'text',
             'is_favorited',
             'is_in_shopping_cart',)
 
     def get_is_favorited(self, obj):
         user = self.context['request'].user
-        return (not user.is_anonymous
-                and obj.favored_by.filter(user=user).exists())
+        return obj.pk in get_viewer_context(user)[FAVORITES]
 
     def get_is_in_shopping_cart(self, obj):
         user = self.context['request'].user
-        return (not user.is_anonymous
-                and obj.carts.filter(user=user).exists())
+        return obj.pk in get_viewer_context(user)[CART]
 
 
 class RecipePostSerializer(ShowingRecipeSerializer):
@@ -128,8 +202,8 @@ class RecipePostSerializer(ShowingRecipeSerializer):
         many=True,)
     image = Base64ImageField(required=False, allow_null=True)
     author = ShowUserSerializer(read_only=True, required=False)
-    tags = serializers.PrimaryKeyRelatedField(many=True,
-                                              queryset=Tag.objects.all())
+    tags = CachedPrimaryKeyRelatedField(get_tag, many=True,
+                                        queryset=Tag.objects.all())
     cooking_time = serializers.IntegerField(
         min_value=MIN_AMOUNT_OR_COOKING_TIME,
         max_value=MAX_AMOUNT_OR_COOKING_TIME,
@@ -160,27 +234,39 @@ class RecipePostSerializer(ShowingRecipeSerializer):
             )
         return ingredients_list
 
+    @transaction.atomic
     def create(self, validated_data):
         author = self.context.get('request').user
         ingredients = validated_data.pop('recipe_recipe_ingredients')
         tags = validated_data.pop('tags')
+        if 'image' in validated_data:
+            validated_data['image'] = save_image(validated_data['image'])
         recipe = Recipe.objects.create(author=author, **validated_data)
         recipe.save()
         recipe.tags.set(tags)
         ingredients_list = self.process_ingredients(recipe, ingredients)
         RecipeIngredient.objects.bulk_create(ingredients_list)
+        if recipe.image:
+            schedule_renditions(recipe.image.name)
         return recipe
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('recipe_recipe_ingredients')
         tags = validated_data.pop('tags')
+        if 'image' in validated_data:
+            validated_data['image'] = save_image(validated_data['image'])
         instance.tags.set(tags)
         instance.recipe_recipe_ingredients.all().delete()
         ingredients_list = self.process_ingredients(instance, ingredients)
         RecipeIngredient.objects.bulk_create(ingredients_list)
+        if validated_data.get('image', instance.image) != instance.image:
+            instance.image_renditions = {}
+            if validated_data['image']:
+                schedule_renditions(validated_data['image'])
         for field, value in validated_data.items():
             setattr(instance, field, value)
         instance.save()
@@ -192,17 +278,67 @@ class RecipePostSerializer(ShowingRecipeSerializer):
             context={'request': self.context.get('request')}).data
 
 
+@transaction.atomic
+def bulk_create_recipes(author, items):
+    author_values = [author.email, author.id, author.username,
+                     author.first_name, author.last_name]
+    recipes = []
+    for data in items:
+        tag_ids = list(dict.fromkeys(tag.id for tag in data['tags']))
+        ingredients = [[item['ingredient']['id'].id, item['amount']]
+                       for item in data['recipe_recipe_ingredients']]
+        recipes.append(Recipe(
+            author=author,
+            name=data['name'],
+            text=data['text'],
+            cooking_time=data['cooking_time'],
+            image=save_image(data.get('image')) or '',
+            snapshot={'author': author_values, 'tags': tag_ids,
+                      'ingredients': ingredients},
+        ))
+    for start in range(0, len(recipes), BULK_BATCH_SIZE):
+        bulk_insert_recipes(recipes[start:start + BULK_BATCH_SIZE])
+    if recipes:
+        bump_version_on_commit(RECIPES)
+        bump_version_on_commit(RECIPE_ROWS)
+    for image in {recipe.image.name for recipe in recipes if recipe.image}:
+        schedule_renditions(image)
+    return recipes
+
+
 class FavouriteSerializer(serializers.ModelSerializer):
     image = Base64ImageField(read_only=True)
+    renditions = RenditionsField()
     name = serializers.ReadOnlyField()
     cooking_time = serializers.ReadOnlyField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time',)
+        fields = ('id', 'name', 'image', 'renditions', 'cooking_time',)
         read_only_fields = ('__all__',)
 
 
+class RecipeImageSerializer(serializers.Serializer):
+    image = serializers.FileField()
+
+    def validate_image(self, value):
+        try:
+            value.image_ext = inspect_image(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        return value
+
+    def update(self, instance, validated_data):
+        instance.image = save_image(validated_data['image'])
+        instance.image_renditions = {}
+        instance.save()
+        schedule_renditions(instance.image.name)
+        return instance
+
+    def to_representation(self, instance):
+        return FavouriteSerializer(instance, context=self.context).data
+
+
 class ShoppingCartSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShoppingCart
@@ -222,22 +358,21 @@ class CreateUserSerializer(UserCreateSerializer):
 class FavoriteShopingCartSubsrRecipeSerializer(serializers.ModelSerializer):
 
     image = Base64ImageField(read_only=True)
+    renditions = RenditionsField()
     name = serializers.ReadOnlyField()
     cooking_time = serializers.ReadOnlyField()
 
     class Meta:
         model = Recipe
-        fields = ['id', 'name', 'image', 'cooking_time']
+        fields = ['id', 'name', 'image', 'renditions', 'cooking_time']
 
     def get_is_favorited(self, obj):
         user = self.context['request'].user
-        return (not user.is_anonymous
-                and obj.favored_by.filter(user=user).exists())
+        return obj.pk in get_viewer_context(user)[FAVORITES]
 
     def get_is_in_shopping_cart(self, obj):
         user = self.context['request'].user
-        return (not user.is_anonymous
-                and obj.carts.filter(user=user).exists())
+        return obj.pk in get_viewer_context(user)[CART]
 
 
 class UserSubscribeSerializer(ShowUserSerializer):
@@ -267,14 +402,10 @@ class UserSubscribeSerializer(ShowUserSerializer):
             raise serializers.ValidationError('Вы уже подписаны.')
         return data
 
-    def get_is_subscribed(self, obj):
-        request = self.context['request']
-        if request and not request.user.is_anonymous:
-            return obj.following.filter(user=request.user).exists()
-        return False
-
     def get_recipes_count(self, obj: User) -> int:
-        return obj.recipes.count()
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
+        return obj.recipes.filter(is_hidden=False).count()
 
 
 class UserPasswordResetSerializer(serializers.Serializer):
@@ -0,0 +1,72 @@
+import hashlib
+import math
+import random
+import time
+
+from django.core.cache import cache
+from django.db import DatabaseError
+
+from recipes.versions import get_versions
+
+
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2
+LOCK_POLL_INTERVAL = 0.05
+STALE_TIMEOUT = 300
+ERROR_BACKOFF = 5
+EARLY_REFRESH_BETA = 1.0
+
+
+def versioned_key(prefix, *names):
+    digest = hashlib.md5(repr(get_versions(*names)).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def _lock_key(key):
+    return f'lock:{key}'
+
+
+def _is_fresh(entry):
+    value, expires, delta = entry
+    jitter = -delta * EARLY_REFRESH_BETA * math.log(1 - random.random())
+    return time.time() + jitter < expires
+
+
+def _wait(key):
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def single_flight(key, compute, timeout):
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry):
+        return entry[0]
+    locked = cache.add(_lock_key(key), 1, LOCK_TIMEOUT)
+    if not locked:
+        entry = entry or _wait(key)
+        if entry is not None:
+            return entry[0]
+    started = time.monotonic()
+    try:
+        value = compute()
+    except DatabaseError:
+        if entry is None:
+            if locked:
+                cache.delete(_lock_key(key))
+            raise
+        cache.set(_lock_key(key), 1, ERROR_BACKOFF)
+        return entry[0]
+    except Exception:
+        if locked:
+            cache.delete(_lock_key(key))
+        raise
+    cache.set(key, (value, time.time() + timeout,
+                    time.monotonic() - started), timeout + STALE_TIMEOUT)
+    if locked:
+        cache.delete(_lock_key(key))
+    return value
@@ -0,0 +1,38 @@
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from api.renderers import dumps
+
+
+STREAM_CHUNK_SIZE = 500
+
+
+def json_array_chunks(rows, chunk_size=STREAM_CHUNK_SIZE):
+    yield b'['
+    separator = b''
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield separator + dumps(chunk)[1:-1]
+            separator = b','
+            chunk = []
+    if chunk:
+        yield separator + dumps(chunk)[1:-1]
+    yield b']'
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+def streaming_json_response(request, rows):
+    chunks = json_array_chunks(rows)
+    response = StreamingHttpResponse(content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if accepts_gzip(request):
+        chunks = compress_sequence(chunks)
+        response['Content-Encoding'] = 'gzip'
+    response.streaming_content = chunks
+    return response
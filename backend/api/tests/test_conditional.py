@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASE='default')
+class RecipeDetailOutageTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(
+            username='cook', email='cook@example.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = Recipe.objects.create(
+                author=author, name='Борщ', text='Варить', cooking_time=60,
+                image='media/borsch.png')
+
+    def test_cached_detail_is_served_while_database_is_down(self):
+        path = f'/api/recipes/{self.recipe.id}/'
+        expected = APIClient().get(path).json()
+        with mock.patch('django.db.backends.utils.CursorWrapper.execute',
+                        side_effect=OperationalError):
+            response = APIClient().get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected)
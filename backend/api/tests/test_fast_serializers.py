@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.serializers import ShowingRecipeSerializer
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from users.models import Follow
+
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASE='default')
+class FastRecipeSerializerTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.viewer = User.objects.create_user(
+                username='viewer', email='viewer@example.com')
+            author = User.objects.create_user(
+                username='author', email='author@example.com',
+                first_name='Анна', last_name='Иванова')
+            tags = [Tag.objects.create(name=f'Тег {number}',
+                                       color=f'#00000{number}',
+                                       slug=f'tag{number}')
+                    for number in range(3)]
+            ingredients = [Ingredient.objects.create(
+                name=f'Ингредиент {number}', measurement_unit='г')
+                for number in range(4)]
+            for number in range(5):
+                recipe = Recipe.objects.create(
+                    author=author if number % 2 else self.viewer,
+                    name=f'Рецепт {number}', text='Текст рецепта',
+                    cooking_time=number + 1, image=f'media/{number}.png',
+                    image_renditions={'thumb': {
+                        'webp': f'media/renditions/thumb/{number}.webp'}})
+                recipe.tags.set(tags[number % 3:])
+                RecipeIngredient.objects.bulk_create([
+                    RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                     amount=number * 10 + index + 1)
+                    for index, ingredient in enumerate(
+                        reversed(ingredients[:number % 4 + 1]))])
+                if number % 2:
+                    Favorite.objects.create(user=self.viewer, recipe=recipe)
+                if number % 3:
+                    ShoppingCart.objects.create(user=self.viewer,
+                                                recipe=recipe)
+            Follow.objects.create(user=self.viewer, author=author)
+        now = timezone.now()
+        for number, recipe in enumerate(Recipe.objects.order_by('id')):
+            Recipe.objects.filter(pk=recipe.pk).update(
+                pub_date=now - timedelta(minutes=number))
+
+    def render(self, user):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        recipes = ShowingRecipeSerializer(
+            Recipe.objects.order_by('-pub_date'), many=True,
+            context={'request': request}).data
+        expected = JSONRenderer().render(OrderedDict([
+            ('count', len(recipes)),
+            ('count_is_estimate', False),
+            ('next', None),
+            ('previous', None),
+            ('results', recipes),
+        ]))
+        client = APIClient()
+        if user.is_authenticated:
+            client.force_authenticate(user)
+        response = client.get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        return response.content, expected
+
+    def test_matches_model_serializer_for_viewer(self):
+        body, expected = self.render(self.viewer)
+        self.assertEqual(body, expected)
+        for flag in (b'"is_subscribed":true', b'"is_favorited":true',
+                     b'"is_in_shopping_cart":true'):
+            self.assertIn(flag, body)
+
+    def test_matches_model_serializer_for_anonymous(self):
+        body, expected = self.render(AnonymousUser())
+        self.assertEqual(body, expected)
@@ -0,0 +1,25 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from users.models import DeletedUser
+from users.purge import hide_user
+
+
+User = get_user_model()
+
+
+class HideUserTest(TestCase):
+
+    def test_failure_leaves_user_untouched(self):
+        user = User.objects.create_user(
+            username='cook', email='cook@example.com')
+        with mock.patch('users.purge.hide_recipes',
+                        side_effect=RuntimeError):
+            with self.captureOnCommitCallbacks() as callbacks:
+                with self.assertRaises(RuntimeError):
+                    hide_user(user)
+        self.assertEqual(callbacks, [])
+        self.assertFalse(DeletedUser.objects.filter(user=user).exists())
+        self.assertTrue(User.objects.get(pk=user.pk).is_active)
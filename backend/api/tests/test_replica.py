@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from foodgram.db_router import mark_recent_write
+from recipes.models import Favorite, Recipe
+
+
+User = get_user_model()
+
+
+class ReplicaRoutingTest(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='pass12345!')
+        self.recipe = Recipe.objects.create(
+            author=self.user, name='Борщ', text='Варить', cooking_time=60,
+            image='media/borsch.png')
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user)}')
+
+    def test_safe_reads_go_to_replica(self):
+        response = APIClient().get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_writes_go_to_default(self):
+        response = self.client.post(
+            f'/api/recipes/{self.recipe.id}/favorite/')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Favorite.objects.using('default').filter(
+            user=self.user, recipe=self.recipe).exists())
+        self.assertFalse(Favorite.objects.using('replica').exists())
+
+    def test_reads_after_write_go_to_default(self):
+        self.client.post(f'/api/recipes/{self.recipe.id}/favorite/')
+        response = self.client.get('/api/recipes/?is_favorited=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.json()['results']],
+            [self.recipe.id])
+
+    def test_replica_reads_do_not_leak_into_primary_cache(self):
+        anonymous = APIClient()
+        self.assertEqual(
+            anonymous.get(f'/api/recipes/{self.recipe.id}/').status_code, 404)
+        self.assertEqual(anonymous.get('/api/recipes/').json()['results'], [])
+        mark_recent_write(self.user)
+        response = self.client.get(f'/api/recipes/{self.recipe.id}/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/recipes/')
+        self.assertEqual(
+            [recipe['id'] for recipe in response.json()['results']],
+            [self.recipe.id])
+
+    def test_replica_counts_do_not_leak_into_primary_cache(self):
+        self.assertEqual(APIClient().get('/api/recipes/').json()['count'], 0)
+        mark_recent_write(self.user)
+        self.assertEqual(self.client.get('/api/recipes/').json()['count'], 1)
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from recipes import versions
+from recipes.models import Recipe, Tag
+
+
+User = get_user_model()
+
+
+class SnapshotRefreshTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='cook', email='cook@example.com', first_name='Иван')
+        self.recipe = Recipe.objects.create(
+            author=self.author, name='Борщ', text='Варить', cooking_time=60,
+            image='media/borsch.png')
+
+    def snapshot(self):
+        return Recipe.objects.get(pk=self.recipe.pk).snapshot
+
+    def record_bumps(self, read):
+        seen = {}
+        bump_version = versions.bump_version
+
+        def record(name):
+            seen.setdefault(name, read())
+            return bump_version(name)
+
+        return seen, mock.patch('recipes.versions.bump_version', record)
+
+    def test_save_without_snapshot_changes_skips_rebuild(self):
+        self.author.set_password('new-pass12345!')
+        with mock.patch('recipes.snapshots.build_snapshots') as build:
+            self.author.save()
+        build.assert_not_called()
+
+    def test_rename_bumps_versions_after_rebuild(self):
+        seen, patch = self.record_bumps(lambda: self.snapshot()['author'][3])
+        self.author.first_name = 'Пётр'
+        with patch:
+            self.author.save()
+        self.assertEqual(self.snapshot()['author'][3], 'Пётр')
+        self.assertEqual(seen[versions.recipe_key(self.recipe.pk)], 'Пётр')
+        self.assertEqual(seen[versions.RECIPE_ROWS], 'Пётр')
+
+    def test_tag_change_bumps_versions_after_rebuild(self):
+        tag = Tag.objects.create(name='Суп', color='#FF0000', slug='soup')
+        seen, patch = self.record_bumps(lambda: self.snapshot()['tags'])
+        with patch:
+            self.recipe.tags.add(tag)
+        self.assertEqual(seen[versions.recipe_key(self.recipe.pk)], [tag.id])
+        self.assertEqual(seen[versions.RECIPE_ROWS], [tag.id])
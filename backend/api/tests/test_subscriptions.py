@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import Follow
+
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASE='default')
+class SubscriptionsQueriesTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com',
+            password='pass12345!')
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user)}')
+
+    def subscribe(self, count):
+        for _ in range(count):
+            number = User.objects.count()
+            author = User.objects.create_user(
+                username=f'author{number}',
+                email=f'author{number}@example.com')
+            Follow.objects.create(user=self.user, author=author)
+            for index in range(3):
+                Recipe.objects.create(
+                    author=author, name=f'Рецепт {index}', text='Текст',
+                    cooking_time=10, image='media/recipe.png')
+
+    def get(self, path, queries):
+        cache.clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_queries_do_not_depend_on_authors(self):
+        self.subscribe(1)
+        data = self.get('/api/users/subscriptions/', 7)
+        self.assertEqual(data['results'][0]['recipes_count'], 3)
+        self.subscribe(5)
+        data = self.get('/api/users/subscriptions/', 7)
+        self.assertEqual(len(data['results']), 6)
+        self.assertEqual([len(author['recipes'])
+                          for author in data['results']], [3] * 6)
+
+    def test_omitted_fields_skip_their_queries(self):
+        self.subscribe(3)
+        data = self.get('/api/users/subscriptions/?omit=recipes', 6)
+        self.assertNotIn('recipes', data['results'][0])
+        data = self.get('/api/users/subscriptions/?fields=id,email', 3)
+        self.assertEqual(set(data['results'][0]), {'id', 'email'})
@@ -0,0 +1,102 @@
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+FAST_PATH_RATIO = 0.5
+LEASE_RATIO = 0.25
+LOCAL_BUCKETS_LIMIT = 10000
+
+_buckets = {}
+_lock = threading.Lock()
+
+
+def parse_rate(rate):
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+def take(key, count, timeout):
+    try:
+        return cache.incr(key, count)
+    except ValueError:
+        if cache.add(key, count, timeout):
+            return count
+        return cache.incr(key, count)
+
+
+class TokenBucketThrottle(BaseThrottle):
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None) or '{}.{}'.format(
+            getattr(view, 'basename', None), getattr(view, 'action', None))
+
+    def get_cache_key(self, request, scope):
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return f'throttle:{scope}:{ident}'
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.get_scope(view))
+        if rate is None:
+            return True
+        self.capacity, self.duration = parse_rate(rate)
+        key = self.get_cache_key(request, self.get_scope(view))
+        window, elapsed = divmod(time.time(), self.duration)
+        self.elapsed = elapsed / self.duration
+        with _lock:
+            bucket = _buckets.get(key)
+            if bucket is not None and bucket[0] == window and bucket[2] >= 1:
+                bucket[2] -= 1
+                return self.finish(request, bucket[2] + bucket[3])
+        if bucket is not None and bucket[0] == window:
+            prev, remaining = bucket[1], bucket[3]
+        else:
+            prev, remaining = cache.get(f'{key}:{window - 1}', 0), 0
+        count = 1
+        if remaining >= self.capacity * FAST_PATH_RATIO:
+            count += int(remaining * LEASE_RATIO)
+        window_key = f'{key}:{window}'
+        used = take(window_key, count, 2 * self.duration)
+        weighted = prev * (1 - self.elapsed)
+        excess = min(count, math.ceil(weighted + used - self.capacity))
+        if excess > 0:
+            cache.decr(window_key, excess)
+            count -= excess
+            used -= excess
+        remaining = max(int(self.capacity - weighted - used), 0)
+        with _lock:
+            if len(_buckets) >= LOCAL_BUCKETS_LIMIT:
+                _buckets.clear()
+            bucket = _buckets.get(key)
+            leased = max(count - 1, 0)
+            if bucket is not None and bucket[0] == window:
+                leased += bucket[2]
+            _buckets[key] = [window, prev, leased, remaining]
+        if count < 1:
+            return self.deny(request, prev, used)
+        return self.finish(request, leased + remaining)
+
+    def finish(self, request, remaining):
+        request.throttle_quota = (self.capacity, remaining)
+        return True
+
+    def deny(self, request, prev, used):
+        self.prev, self.used = prev, used
+        request.throttle_quota = (self.capacity, 0)
+        return False
+
+    def wait(self):
+        free = self.capacity - 1
+        if self.used <= free and self.prev:
+            fraction = 1 - (free - self.used) / self.prev
+            return max(fraction - self.elapsed, 0) * self.duration
+        fraction = 1 - free / self.used
+        return (1 - self.elapsed + fraction) * self.duration
@@ -0,0 +1,42 @@
+import hashlib
+
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+from rest_framework.parsers import FileUploadParser
+
+from recipes.images import MAX_IMAGE_SIZE
+
+
+MAX_UPLOAD_BODY = MAX_IMAGE_SIZE + 64 * 1024
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_IMAGE_SIZE:
+            self.too_large = True
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.digest.hexdigest()
+        return file
+
+
+class ImageUploadParser(FileUploadParser):
+
+    def get_filename(self, stream, media_type, parser_context):
+        return super().get_filename(
+            stream, media_type, parser_context) or 'upload'
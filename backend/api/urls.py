@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
+from api.async_views import async_read_urls
 from api.views import (CustomUserViewSet, IngredientViewSet, RecipeViewSet,
                        TagViewSet)
 
@@ -10,8 +12,14 @@ router.register('tags', TagViewSet)
 router.register('ingredients', IngredientViewSet)
 router.register('recipes', RecipeViewSet)
 
+ASYNC_READ_URLS = ('tag-list', 'tag-detail', 'ingredient-list',
+                   'ingredient-detail', 'recipe-list', 'recipe-detail')
+
+router_urls = router.urls
+if settings.ASYNC_READ_VIEWS:
+    router_urls = async_read_urls(router_urls, ASYNC_READ_URLS)
 
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
-    path('', include(router.urls)),
+    path('', include(router_urls)),
 ]
@@ -1,35 +1,74 @@
 from django.contrib.auth import get_user_model
-from django.db.models import F, Sum
-from django.http import HttpResponse
+from django.core.files.uploadhandler import StopUpload
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import filters, status, viewsets
 
+from api.conditional import (ingredients_versions, recipe_versions,
+                             tags_versions, versioned)
+from api.fast_serializers import (RECIPE_FIELDS, FastRecipeSerializer,
+                                  recipe_values)
+from api.fieldsets import SparseFieldsViewMixin, requested_fields
 from api.filters import RecipeFilter
-from api.pagination import CustomPaginator
+from api.mixins import ReplicaReadMixin, ThrottleHeadersMixin
+from api.pagination import CustomPaginator, query_signature
+from api.precompressed import precompressed_response
 from api.serializers import (CreateUserSerializer,
                              FavoriteShopingCartSubsrRecipeSerializer,
                              FavouriteSerializer, IngredientSerializer,
-                             RecipePostSerializer, ShowingRecipeSerializer,
+                             RecipeImageSerializer, RecipePostSerializer,
+                             ShowingRecipeSerializer,
                              ShowUserSerializer, TagSerializer,
                              UserPasswordResetSerializer,
-                             UserSubscribeSerializer)
+                             UserSubscribeSerializer, bulk_create_recipes)
+from api.singleflight import single_flight, versioned_key
+from api.streaming import STREAM_CHUNK_SIZE, streaming_json_response
+from api.uploads import (MAX_UPLOAD_BODY, HashingUploadHandler,
+                         ImageUploadParser)
+from recipes.cache import get_tags_by_id
 from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
                             ShoppingCart, Tag)
+from recipes.purge import hide_recipes
+from recipes.versions import (INGREDIENTS, RECIPE_ROWS, RECIPES, USERS,
+                              viewer_key)
 from users.models import Follow
+from users.purge import hide_user
 
 
 User = get_user_model()
 
+VIEWER_FILTERS = {'is_favorited', 'is_in_shopping_cart'}
+MAX_BATCH_IDS = 100
+MAX_BULK_RECIPES = 500
+BULK_MODES = ('atomic', 'partial')
+RECIPE_CACHE_TIMEOUT = 60
+SHOPPING_LIST_CACHE_TIMEOUT = 300
 
-class CustomUserViewSet(UserViewSet):
-    queryset = User.objects.all()
+
+def annotate_users(queryset):
+    recipes_count = Recipe.objects.filter(
+        author=OuterRef('pk'), is_hidden=False).order_by().values(
+            'author').annotate(count=Count('pk')).values('count')
+    return queryset.annotate(
+        recipes_count=Coalesce(Subquery(recipes_count), 0))
+
+
+class CustomUserViewSet(ReplicaReadMixin, ThrottleHeadersMixin,
+                        SparseFieldsViewMixin, UserViewSet):
+    queryset = User.objects.filter(deletion__isnull=True).order_by('id')
     pagination_class = CustomPaginator
     http_method_names = ['get', 'post', 'delete']
+    filter_backends = [filters.SearchFilter]
+    search_fields = ['^username', '^email']
 
     def get_serializer_class(self):
         if self.action in ['subscriptions', 'subscribe']:
@@ -38,17 +77,28 @@ class CustomUserViewSet(UserViewSet):
             return ShowUserSerializer
         if self.request.method == 'POST':
             return CreateUserSerializer
+        return super().get_serializer_class()
 
     def get_permissions(self):
         if self.action == 'retrieve':
             self.permission_classes = [IsAuthenticated, ]
         return super(self.__class__, self).get_permissions()
 
+    def perform_destroy(self, instance):
+        hide_user(instance)
+
+    def get_count_versions(self):
+        if self.action == 'subscriptions':
+            return [USERS, viewer_key(self.request.user.pk)]
+        return [USERS]
+
     @action(detail=False, methods=['get'],
             pagination_class=None,
             permission_classes=(IsAuthenticated,))
     def me_users(self, request):
-        serializer = ShowUserSerializer(request.user)
+        serializer = ShowUserSerializer(
+            request.user, context={'request': request},
+            fields=self.get_requested_fields(ShowUserSerializer))
         return Response(serializer.data,
                         status=status.HTTP_200_OK)
 
@@ -66,16 +116,26 @@ class CustomUserViewSet(UserViewSet):
             permission_classes=(IsAuthenticated,),
             pagination_class=CustomPaginator)
     def subscriptions(self, request):
-        queryset = User.objects.filter(following__user=request.user)
+        fields = self.get_requested_fields(UserSubscribeSerializer)
+        queryset = User.objects.filter(
+            following__user=request.user,
+            deletion__isnull=True).order_by('id')
+        if 'recipes_count' in fields:
+            queryset = annotate_users(queryset)
+        if 'recipes' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'recipes', queryset=Recipe.objects.filter(is_hidden=False)))
         page = self.paginate_queryset(queryset)
-        serializer = UserSubscribeSerializer(page, many=True,
-                                             context={'request': request})
+        serializer = UserSubscribeSerializer(
+            page, many=True, context={'request': request},
+            fields=fields)
         return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post', 'delete'],
             permission_classes=(IsAuthenticated,))
     def subscribe(self, request, **kwargs):
-        author = get_object_or_404(User, id=kwargs['id'])
+        author = get_object_or_404(User, id=kwargs['id'],
+                                   deletion__isnull=True)
         serializer = UserSubscribeSerializer(
             author, data=request.data, context={'request': request})
         if request.method == 'POST':
@@ -93,13 +153,30 @@ class CustomUserViewSet(UserViewSet):
                             status=status.HTTP_204_NO_CONTENT)
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ReplicaReadMixin, ThrottleHeadersMixin,
+                 viewsets.ModelViewSet):
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
     pagination_class = None
 
+    @method_decorator(versioned(tags_versions))
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == 'json':
+            return precompressed_response(request, 'tags')
+        return Response(list(get_tags_by_id().values()))
+
+    @method_decorator(versioned(tags_versions))
+    def retrieve(self, request, *args, **kwargs):
+        tag = None
+        if str(kwargs['pk']).isdigit():
+            tag = get_tags_by_id().get(int(kwargs['pk']))
+        if tag is None:
+            raise Http404
+        return Response(tag)
 
-class IngredientViewSet(viewsets.ModelViewSet):
+
+class IngredientViewSet(ReplicaReadMixin, ThrottleHeadersMixin,
+                        viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = [filters.SearchFilter]
@@ -107,6 +184,22 @@ class IngredientViewSet(viewsets.ModelViewSet):
     lookup_field = 'name__istartswith'
     pagination_class = None
 
+    @method_decorator(versioned(ingredients_versions))
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        if not {'name', 'search'} & set(request.query_params):
+            return precompressed_response(request, 'ingredients')
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.using(queryset.db).values(
+            'id', 'name', 'measurement_unit').iterator(
+                chunk_size=STREAM_CHUNK_SIZE)
+        return streaming_json_response(request, rows)
+
+    @method_decorator(versioned(ingredients_versions))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_queryset(self):
         queryset = self.queryset
         name = self.request.query_params.get('name', None)
@@ -115,11 +208,13 @@ class IngredientViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
-    queryset = Recipe.objects.all().order_by('-pub_date')
+class RecipeViewSet(ReplicaReadMixin, ThrottleHeadersMixin,
+                    viewsets.ModelViewSet):
+    queryset = Recipe.objects.filter(is_hidden=False).order_by('-pub_date')
     pagination_class = CustomPaginator
     filterset_class = RecipeFilter
     filter_backends = (DjangoFilterBackend, )
+    page_versions = [RECIPE_ROWS]
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -129,10 +224,124 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return RecipePostSerializer
 
+    def get_count_versions(self):
+        user = self.request.user
+        if user.is_authenticated and VIEWER_FILTERS & set(
+                self.request.query_params):
+            return [RECIPES, viewer_key(user.pk)]
+        return [RECIPES]
+
+    def list(self, request, *args, **kwargs):
+        fields = requested_fields(request, RECIPE_FIELDS)
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *recipe_values(fields))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = FastRecipeSerializer(
+                page, context={'request': request}, fields=fields)
+            return self.get_paginated_response(serializer.data)
+        serializer = FastRecipeSerializer(
+            queryset, context={'request': request}, fields=fields)
+        return Response(serializer.data)
+
+    @method_decorator(versioned(recipe_versions))
+    def retrieve(self, request, *args, **kwargs):
+        fields = requested_fields(request, RECIPE_FIELDS)
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *recipe_values(fields))
+        if not str(kwargs['pk']).isdigit():
+            raise Http404
+        queryset = queryset.filter(pk=kwargs['pk'])
+        rows = single_flight(
+            f'recipe:{query_signature(queryset, [RECIPE_ROWS])}',
+            lambda: list(queryset), RECIPE_CACHE_TIMEOUT)
+        if not rows:
+            raise Http404
+        serializer = FastRecipeSerializer(
+            rows, context={'request': request}, fields=fields)
+        return Response(serializer.data[0])
+
+    def perform_destroy(self, instance):
+        hide_recipes(Recipe.objects.filter(pk=instance.pk))
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def batch(self, request):
+        values = [value.strip() for value in
+                  request.query_params.get('ids', '').split(',')
+                  if value.strip()]
+        for value in values:
+            if not value.isdigit():
+                return Response({'errors': f'Некорректный id: {value}'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(int(value) for value in values))
+        if not ids:
+            return Response({'errors': 'Укажите id рецептов в параметре ids'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_BATCH_IDS:
+            return Response(
+                {'errors': f'Можно запросить не более {MAX_BATCH_IDS} '
+                           f'рецептов за раз'},
+                status=status.HTTP_400_BAD_REQUEST)
+        fields = requested_fields(request, RECIPE_FIELDS)
+        rows = {row['id']: row for row in self.get_queryset().filter(
+            pk__in=ids).values(*recipe_values(fields))}
+        found = [rows[recipe_id] for recipe_id in ids if recipe_id in rows]
+        serializer = FastRecipeSerializer(
+            found, context={'request': request}, fields=fields)
+        return Response({
+            'results': serializer.data,
+            'missing': [recipe_id for recipe_id in ids
+                        if recipe_id not in rows],
+        })
+
+    @action(detail=False, methods=['post'],
+            permission_classes=(IsAuthenticated,))
+    def bulk(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        items = data.get('recipes')
+        mode = data.get('mode', 'atomic')
+        if not isinstance(items, list) or not items:
+            return Response({'errors': 'Передайте список рецептов в recipes'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BULK_RECIPES:
+            return Response(
+                {'errors': f'Можно загрузить не более {MAX_BULK_RECIPES} '
+                           f'рецептов за раз'},
+                status=status.HTTP_400_BAD_REQUEST)
+        if mode not in BULK_MODES:
+            return Response(
+                {'errors': f"Режим должен быть одним из: "
+                           f"{', '.join(BULK_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST)
+        context = self.get_serializer_context()
+        results = []
+        valid = []
+        for index, item in enumerate(items):
+            serializer = RecipePostSerializer(data=item, context=context)
+            if serializer.is_valid():
+                results.append({'index': index, 'status': 'valid'})
+                valid.append((index, serializer.validated_data))
+            else:
+                results.append({'index': index, 'status': 'invalid',
+                                'errors': serializer.errors})
+        if mode == 'atomic' and len(valid) < len(items):
+            for index, _ in valid:
+                results[index]['status'] = 'skipped'
+            return Response({'created': 0, 'results': results},
+                            status=status.HTTP_400_BAD_REQUEST)
+        recipes = bulk_create_recipes(
+            request.user, [data for _, data in valid])
+        for (index, _), recipe in zip(valid, recipes):
+            results[index].update(status='created', id=recipe.id)
+        return Response(
+            {'created': len(recipes), 'results': results},
+            status=(status.HTTP_201_CREATED if len(valid) == len(items)
+                    else status.HTTP_207_MULTI_STATUS))
+
     @action(detail=True, methods=['post', 'delete'],
             permission_classes=(IsAuthenticated,))
     def favorite(self, request, **kwargs):
-        recipe = get_object_or_404(Recipe, id=kwargs['pk'])
+        recipe = get_object_or_404(Recipe, id=kwargs['pk'], is_hidden=False)
         serializer = FavouriteSerializer(recipe, context={'request': request})
         if request.method == 'POST':
             if request.user.favorite_recipes.filter(recipe=recipe).exists():
@@ -150,6 +359,33 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return Response({'detail': 'Рецепт удален из избранного'},
                         status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=True, methods=['put'],
+            permission_classes=(IsAuthenticated,),
+            parser_classes=(MultiPartParser, ImageUploadParser))
+    def image(self, request, **kwargs):
+        recipe = get_object_or_404(Recipe, id=kwargs['pk'], is_hidden=False)
+        if recipe.author != request.user:
+            return Response(
+                {'errors': 'Изменить изображение может только автор'},
+                status=status.HTTP_403_FORBIDDEN)
+        if int(request.META.get('CONTENT_LENGTH') or 0) > MAX_UPLOAD_BODY:
+            return Response({'errors': 'Слишком большой файл'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        upload_handler = HashingUploadHandler(request._request)
+        request._request.upload_handlers = [upload_handler]
+        try:
+            image = request.data.get('image') or request.data.get('file')
+        except StopUpload:
+            upload_handler.too_large = True
+        if upload_handler.too_large:
+            return Response({'errors': 'Слишком большой файл'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        serializer = RecipeImageSerializer(recipe, data={'image': image},
+                                           context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post', 'delete'],
             permission_classes=(IsAuthenticated,),
             pagination_class=None)
@@ -181,21 +417,29 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def download_shopping_cart(self, request):
         user = request.user
-        shopping_cart_items = ShoppingCart.objects.filter(user=user)
-        recipes = [item.recipe for item in shopping_cart_items]
-        ingredients = RecipeIngredient.objects.filter(recipe__in=recipes)
+        lines = single_flight(
+            versioned_key(f'shopping_list:{user.pk}', viewer_key(user.pk),
+                          RECIPE_ROWS, INGREDIENTS),
+            lambda: self.shopping_list_lines(user),
+            SHOPPING_LIST_CACHE_TIMEOUT)
+        file_name = 'shopping_cart.txt'
+        response = HttpResponse(content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        for line in lines:
+            response.write(line)
+        return response
+
+    def shopping_list_lines(self, user):
+        ingredients = RecipeIngredient.objects.filter(
+            recipe__carts__user=user, recipe__is_hidden=False)
         ingredient_data = ingredients.values(
             recipe_name=F('ingredient__name'),
             measurement_unit=F('ingredient__measurement_unit')
         ).annotate(
             amount=Sum('amount')
         )
-        file_name = 'shopping_cart.txt'
-        response = HttpResponse(content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-        for ingredient in ingredient_data:
-            response.write(
-                f"{ingredient['recipe_name']} - {ingredient['amount']}"
-                f" {ingredient['measurement_unit']}\n"
-            )
-        return response
+        return [
+            f"{ingredient['recipe_name']} - {ingredient['amount']}"
+            f" {ingredient['measurement_unit']}\n"
+            for ingredient in ingredient_data
+        ]
@@ -0,0 +1,44 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def _sticky_key(user_id):
+    return f'recent_write:{user_id}'
+
+
+def mark_recent_write(user):
+    cache.set(_sticky_key(user.pk), True,
+              settings.READ_AFTER_WRITE_STICKINESS)
+
+
+def has_recent_write(user):
+    return (user.is_authenticated
+            and cache.get(_sticky_key(user.pk)) is not None)
+
+
+def use_replica(value):
+    return _read_from_replica.set(value)
+
+
+def restore_replica(token):
+    _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (_read_from_replica.get()
+                and settings.REPLICA_DATABASE in settings.DATABASES):
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
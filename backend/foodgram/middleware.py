@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from recipes.cache import check_versions
+
+
+class DatabaseHealthCheckMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        self.check_connections()
+        return self.get_response(request)
+
+    def check_connections(self):
+        now = time.monotonic()
+        for connection in connections.all():
+            if connection.connection is None:
+                continue
+            checked_at = getattr(connection, 'health_checked_at', 0)
+            if now - checked_at < settings.DB_HEALTH_CHECK_INTERVAL:
+                continue
+            connection.health_checked_at = now
+            if not connection.is_usable():
+                connection.close()
+
+
+class ReferenceCacheMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        check_versions()
+        return self.get_response(request)
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'api',
     'recipes',
     'users',
+    'jobs',
     'django_filters',
 ]
 
@@ -38,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'foodgram.middleware.ReferenceCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'foodgram.urls'
@@ -60,6 +62,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
 
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'False') == 'True'
+
 
 DATABASES = {
     'default': {
@@ -72,6 +76,32 @@ DATABASES = {
     }
 }
 
+REPLICA_DATABASE = 'replica'
+
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['foodgram.db_router.ReplicaRouter']
+
+READ_AFTER_WRITE_STICKINESS = int(
+    os.getenv('READ_AFTER_WRITE_STICKINESS', 5))
+
+PAGINATION_ESTIMATE_THRESHOLD = int(
+    os.getenv('PAGINATION_ESTIMATE_THRESHOLD', 0))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND',
+                             'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -111,8 +141,27 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 6,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'recipe.create': os.getenv('THROTTLE_RECIPE_CREATE', '10/m'),
+        'recipe.bulk': os.getenv('THROTTLE_RECIPE_BULK', '5/m'),
+        'recipe.update': os.getenv('THROTTLE_RECIPE_UPDATE', '30/m'),
+        'recipe.partial_update': os.getenv('THROTTLE_RECIPE_UPDATE', '30/m'),
+        'recipe.image': os.getenv('THROTTLE_RECIPE_IMAGE', '10/m'),
+        'recipe.favorite': os.getenv('THROTTLE_FAVORITE', '60/m'),
+        'recipe.shopping_cart': os.getenv('THROTTLE_SHOPPING_CART', '60/m'),
+        'user.subscribe': os.getenv('THROTTLE_SUBSCRIBE', '30/m'),
+        'ingredient.list': os.getenv('THROTTLE_INGREDIENTS', '120/m'),
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
 DJOSER = {
@@ -0,0 +1,19 @@
+import os
+
+from foodgram.settings import *  # noqa: F401,F403
+from foodgram.settings import DATABASES, MIDDLEWARE
+
+
+DEBUG = os.getenv('DEBUG', 'False') == 'True'
+
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 60))
+PGBOUNCER = os.getenv('PGBOUNCER', 'False') == 'True'
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = CONN_MAX_AGE
+    database['DISABLE_SERVER_SIDE_CURSORS'] = PGBOUNCER
+
+DB_HEALTH_CHECK_INTERVAL = int(os.getenv('DB_HEALTH_CHECK_INTERVAL', 30))
+
+MIDDLEWARE = ['foodgram.middleware.DatabaseHealthCheckMiddleware',
+              *MIDDLEWARE]
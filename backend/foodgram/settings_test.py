@@ -0,0 +1,20 @@
+import os
+
+from foodgram.settings import *  # noqa: F401,F403
+from foodgram.settings import BASE_DIR, REPLICA_DATABASE
+
+
+SQLITE_DIR = os.getenv('SQLITE_DIR', BASE_DIR)
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(SQLITE_DIR, 'db.sqlite3'),
+    },
+    REPLICA_DATABASE: {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(SQLITE_DIR, 'db_replica.sqlite3'),
+    },
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,40 @@
+import multiprocessing
+import os
+
+
+wsgi_app = os.getenv('GUNICORN_APP', 'foodgram.wsgi:application')
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+workers = int(os.getenv('GUNICORN_WORKERS',
+                        multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    from django.db import connections
+
+    from recipes.cache import prewarm
+
+    try:
+        prewarm()
+    except Exception:
+        worker.log.exception('Не удалось прогреть кэш справочников')
+    finally:
+        connections.close_all()
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'task')
+    search_fields = ('dedup_key',)
@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+import signal
+import time
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.queue import claim, requeue_stale, run
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int,
+                            default=os.cpu_count() or 1)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить накопленные задачи и выйти.')
+
+    def handle(self, *args, **options):
+        requeue_stale()
+        if options['once']:
+            self.work(options['poll_interval'], once=True)
+            return
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=self.work,
+                                    args=(options['poll_interval'],))
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        signal.signal(signal.SIGTERM, lambda *args: [
+            process.terminate() for process in processes])
+        for process in processes:
+            process.join()
+
+    def work(self, poll_interval, once=False):
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+        while not stopping:
+            close_old_connections()
+            job = claim()
+            if job is not None:
+                run(job)
+                continue
+            if once:
+                return
+            time.sleep(poll_interval)
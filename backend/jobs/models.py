@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField(max_length=200, verbose_name='Задача')
+    args = models.JSONField(default=list, blank=True,
+                            verbose_name='Аргументы')
+    kwargs = models.JSONField(default=dict, blank=True,
+                              verbose_name='Именованные аргументы')
+    dedup_key = models.CharField(max_length=200, null=True, blank=True,
+                                 verbose_name='Ключ дедупликации')
+    status = models.CharField(max_length=10, choices=STATUSES,
+                              default=QUEUED, verbose_name='Статус')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попытки')
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5, verbose_name='Максимум попыток')
+    run_at = models.DateTimeField(default=timezone.now,
+                                  verbose_name='Запустить после')
+    locked_at = models.DateTimeField(null=True, blank=True,
+                                     verbose_name='Взята в работу')
+    last_error = models.TextField(blank=True,
+                                  verbose_name='Последняя ошибка')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Создана')
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [models.Index(fields=['status', 'run_at'],
+                                name='job_status_run_at_idx')]
+        constraints = [models.UniqueConstraint(
+            fields=['dedup_key'],
+            condition=models.Q(status='queued'),
+            name='unique_queued_dedup_key'
+        )]
+
+    def __str__(self):
+        return f'{self.task} ({self.status})'
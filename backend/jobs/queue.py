@@ -0,0 +1,78 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+
+
+RETRY_DELAY = 10
+STALE_AFTER = timedelta(minutes=10)
+
+logger = logging.getLogger(__name__)
+
+
+def job(func):
+    func.is_job = True
+    func.delay = lambda *args, dedup_key=None, **kwargs: enqueue(
+        func, *args, dedup_key=dedup_key, **kwargs)
+    return func
+
+
+def enqueue(func, *args, dedup_key=None, **kwargs):
+    task = f'{func.__module__}.{func.__name__}'
+    transaction.on_commit(lambda: Job.objects.bulk_create(
+        [Job(task=task, args=list(args), kwargs=kwargs,
+             dedup_key=dedup_key)],
+        ignore_conflicts=True))
+
+
+def requeue_stale():
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - STALE_AFTER,
+    ).update(status=Job.QUEUED, locked_at=None)
+
+
+def claim():
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.QUEUED, run_at__lte=timezone.now()
+        ).order_by('run_at').first()
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.locked_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'locked_at'])
+    return job
+
+
+def run(job):
+    try:
+        func = import_string(job.task)
+        if not getattr(func, 'is_job', False):
+            raise ValueError(f'{job.task} не является фоновой задачей')
+        func(*job.args, **job.kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', job.task)
+        job.last_error = traceback.format_exc()
+        job.locked_at = None
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = Job.FAILED
+        try:
+            with transaction.atomic():
+                job.save(update_fields=['status', 'run_at', 'locked_at',
+                                        'last_error'])
+        except IntegrityError:
+            job.delete()
+        return False
+    job.delete()
+    return True
@@ -1,37 +1,87 @@
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 from recipes.models import (Recipe, Ingredient, Tag, ShoppingCart, Favorite,
                             RecipeIngredient)
+from recipes.purge import hide_recipes
 
 
 class RecipeIngredientInLine(admin.TabularInline):
     model = RecipeIngredient
     extra = 1
     min_num = 1
+    autocomplete_fields = ('ingredient',)
 
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     inlines = (RecipeIngredientInLine, )
+    list_display = ('name', 'author', 'pub_date', 'favorites_count')
+    list_select_related = ('author',)
+    list_filter = ('tags',)
+    search_fields = ('^name', '^author__username')
+    autocomplete_fields = ('author', 'tags')
+    readonly_fields = ('favorites_count',)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        favorites = Favorite.objects.filter(
+            recipe=OuterRef('pk')).order_by().values('recipe').annotate(
+                count=Count('pk')).values('count')
+        return super().get_queryset(request).filter(
+            is_hidden=False).annotate(
+                favorites_count=Coalesce(Subquery(favorites), 0))
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        hide_recipes(Recipe.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        hide_recipes(queryset)
+
+    @admin.display(description='В избранном')
+    def favorites_count(self, obj):
+        return obj.favorites_count
 
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
-    list_filter = ('name',)
+    search_fields = ('^name',)
+    show_full_result_count = False
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     list_display = ('name', 'color', 'slug')
     list_filter = ('name',)
+    search_fields = ('^name', '^slug')
 
 
 @admin.register(Favorite)
 class FavouriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    search_fields = ('^user__username', '^recipe__name')
+    autocomplete_fields = ('user', 'recipe')
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(
+            recipe__is_hidden=False, user__deletion__isnull=True)
 
 
 @admin.register(ShoppingCart)
 class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
+    list_select_related = ('user', 'recipe')
+    search_fields = ('^user__username', '^recipe__name')
+    autocomplete_fields = ('user', 'recipe')
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(
+            recipe__is_hidden=False, user__deletion__isnull=True)
@@ -0,0 +1,99 @@
+import time
+
+from django.core.cache import cache
+
+from recipes.models import Ingredient, Tag
+from recipes.versions import INGREDIENTS, TAGS, get_versions
+
+
+REFERENCE_CACHE_TIMEOUT = 300
+SHARED_CACHE_TIMEOUT = 24 * 60 * 60
+REFERENCE_VERSIONS = {
+    'tags': TAGS,
+    'tag_ids_by_slug': TAGS,
+    'ingredients': INGREDIENTS,
+}
+
+_cache = {}
+
+
+def _shared_key(name):
+    return f'reference:{name}'
+
+
+def check_versions():
+    names = sorted(set(REFERENCE_VERSIONS.values()))
+    current = dict(zip(names, get_versions(*names)))
+    for name, entry in list(_cache.items()):
+        if entry[1] != current[REFERENCE_VERSIONS[name]]:
+            _cache.pop(name, None)
+
+
+def _cached(name, load):
+    entry = _cache.get(name)
+    if entry is not None and entry[0] >= time.monotonic():
+        return entry[2]
+    version, = get_versions(REFERENCE_VERSIONS[name])
+    shared = cache.get(_shared_key(name))
+    if shared is not None and shared[0] == version:
+        value = shared[1]
+    else:
+        value = load()
+        cache.set(_shared_key(name), (version, value), SHARED_CACHE_TIMEOUT)
+    _cache[name] = (time.monotonic() + REFERENCE_CACHE_TIMEOUT, version,
+                    value)
+    return value
+
+
+def get_tags_by_id():
+    return _cached('tags', lambda: {
+        tag['id']: tag
+        for tag in Tag.objects.values('id', 'slug', 'name', 'color')
+    })
+
+
+def get_tag_ids_by_slug():
+    return _cached('tag_ids_by_slug', lambda: {
+        tag['slug']: tag_id for tag_id, tag in get_tags_by_id().items()
+    })
+
+
+def get_ingredients_by_id():
+    return _cached('ingredients', lambda: {
+        ingredient_id: (name, measurement_unit)
+        for ingredient_id, name, measurement_unit
+        in Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+    })
+
+
+def get_tag(tag_id):
+    tag = get_tags_by_id().get(tag_id)
+    return Tag(**tag) if tag is not None else None
+
+
+def get_ingredient(ingredient_id):
+    ingredient = get_ingredients_by_id().get(ingredient_id)
+    if ingredient is None:
+        return None
+    name, measurement_unit = ingredient
+    return Ingredient(id=ingredient_id, name=name,
+                      measurement_unit=measurement_unit)
+
+
+def tag_slug_choices():
+    return [(slug, slug) for slug in get_tag_ids_by_slug()]
+
+
+def prewarm():
+    get_tags_by_id()
+    get_tag_ids_by_slug()
+    get_ingredients_by_id()
+
+
+def clear_tag_cache():
+    _cache.pop('tags', None)
+    _cache.pop('tag_ids_by_slug', None)
+
+
+def clear_ingredient_cache():
+    _cache.pop('ingredients', None)
@@ -0,0 +1,227 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Q
+
+from recipes.cache import clear_ingredient_cache, clear_tag_cache
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.snapshots import build_snapshots
+from recipes.versions import (INGREDIENTS, RECIPE_ROWS, RECIPES, TAGS, USERS,
+                              bump_version)
+
+
+User = get_user_model()
+
+CATALOG_BATCH_SIZE = 1000
+AUTHOR_FIELDS = ('email', 'id', 'username', 'first_name', 'last_name')
+
+
+def export_catalog(batch_size=CATALOG_BATCH_SIZE):
+    tags = {tag['id']: tag for tag in Tag.objects.values(
+        'id', 'slug', 'name', 'color')}
+    ingredients = {
+        ingredient_id: (name, measurement_unit)
+        for ingredient_id, name, measurement_unit
+        in Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+    }
+    recipes = Recipe.objects.filter(is_hidden=False).order_by('id').values(
+        'id', 'name', 'text', 'cooking_time', 'image', 'image_renditions',
+        'snapshot')
+    last_id = 0
+    while True:
+        batch = list(recipes.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        missing = [row['id'] for row in batch if not row['snapshot']]
+        snapshots = build_snapshots(missing) if missing else {}
+        for row in batch:
+            snapshot = row['snapshot'] or snapshots[row['id']]
+            email, _, username, first_name, last_name = snapshot['author']
+            yield {
+                'id': row['id'],
+                'name': row['name'],
+                'text': row['text'],
+                'cooking_time': row['cooking_time'],
+                'image': row['image'],
+                'renditions': row['image_renditions'],
+                'author': {
+                    'email': email,
+                    'username': username,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                },
+                'tags': [
+                    {key: tags[tag_id][key] for key in ('slug', 'name',
+                                                        'color')}
+                    for tag_id in snapshot['tags'] if tag_id in tags
+                ],
+                'ingredients': [
+                    {
+                        'name': ingredients[ingredient_id][0],
+                        'measurement_unit': ingredients[ingredient_id][1],
+                        'amount': amount,
+                    }
+                    for ingredient_id, amount in snapshot['ingredients']
+                    if ingredient_id in ingredients
+                ],
+            }
+        last_id = batch[-1]['id']
+
+
+def bulk_insert_recipes(recipes):
+    if connection.features.can_return_rows_from_bulk_insert:
+        Recipe.objects.bulk_create(recipes)
+    else:
+        for recipe in recipes:
+            recipe.save()
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag_id)
+        for recipe in recipes for tag_id in recipe.snapshot['tags']
+    ])
+    RecipeIngredient.objects.bulk_create([
+        RecipeIngredient(recipe_id=recipe.id, ingredient_id=ingredient_id,
+                         amount=amount)
+        for recipe in recipes
+        for ingredient_id, amount in recipe.snapshot['ingredients']
+    ])
+    return recipes
+
+
+def _author_key(author):
+    if author.get('email'):
+        return 'email', author['email']
+    return 'username', author['username']
+
+
+class CatalogImporter:
+
+    def __init__(self):
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        self.ingredients = {
+            (name, measurement_unit): ingredient_id
+            for ingredient_id, name, measurement_unit
+            in Ingredient.objects.values_list('id', 'name',
+                                              'measurement_unit')
+        }
+        self.authors = {}
+        self.created = {'recipes': 0, 'tags': 0, 'ingredients': 0,
+                        'users': 0}
+
+    def import_batch(self, items):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+            self.ensure_tags(items)
+            self.ensure_ingredients(items)
+            self.ensure_authors(items)
+            self.create_recipes(items)
+
+    def ensure_tags(self, items):
+        missing = {}
+        for item in items:
+            for tag in item['tags']:
+                if tag['slug'] not in self.tags:
+                    missing[tag['slug']] = tag
+        if not missing:
+            return
+        Tag.objects.bulk_create(
+            [Tag(slug=slug, name=tag['name'], color=tag['color'])
+             for slug, tag in missing.items()],
+            ignore_conflicts=True)
+        self.tags.update(Tag.objects.filter(
+            slug__in=missing).values_list('slug', 'id'))
+        self.created['tags'] += len(missing)
+
+    def ensure_ingredients(self, items):
+        missing = {
+            (ingredient['name'], ingredient['measurement_unit'])
+            for item in items for ingredient in item['ingredients']
+        } - self.ingredients.keys()
+        if not missing:
+            return
+        Ingredient.objects.bulk_create(
+            [Ingredient(name=name, measurement_unit=measurement_unit)
+             for name, measurement_unit in missing])
+        for ingredient_id, name, measurement_unit in (
+                Ingredient.objects.filter(
+                    name__in={name for name, _ in missing}).values_list(
+                        'id', 'name', 'measurement_unit')):
+            self.ingredients.setdefault((name, measurement_unit),
+                                        ingredient_id)
+        self.created['ingredients'] += len(missing)
+
+    def ensure_authors(self, items):
+        missing = {}
+        for item in items:
+            key = _author_key(item['author'])
+            if key not in self.authors:
+                missing[key] = item['author']
+        if not missing:
+            return
+        emails = [value for kind, value in missing if kind == 'email']
+        usernames = [value for kind, value in missing if kind == 'username']
+        for values in User.objects.filter(
+                Q(email__in=emails) | Q(username__in=usernames)
+        ).order_by('id').values_list(*AUTHOR_FIELDS):
+            email, _, username = values[:3]
+            for key in (('email', email), ('username', username)):
+                if key in missing:
+                    self.authors.setdefault(key, list(values))
+        new = {key: author for key, author in missing.items()
+               if key not in self.authors}
+        if not new:
+            return
+        taken = set(User.objects.filter(username__in=[
+            author['username'] for author in new.values()
+        ]).values_list('username', flat=True))
+        users = []
+        for key, author in new.items():
+            username = author['username']
+            suffix = 1
+            while username in taken:
+                suffix += 1
+                username = f"{author['username']}_{suffix}"
+            taken.add(username)
+            users.append((key, User(
+                email=author['email'], username=username,
+                first_name=author['first_name'],
+                last_name=author['last_name'],
+                password=make_password(None))))
+        User.objects.bulk_create([user for _, user in users])
+        created = {values[2]: list(values) for values in User.objects.filter(
+            username__in=[user.username for _, user in users]
+        ).values_list(*AUTHOR_FIELDS)}
+        for key, user in users:
+            self.authors[key] = created[user.username]
+        self.created['users'] += len(users)
+
+    def create_recipes(self, items):
+        recipes = []
+        for item in items:
+            author = self.authors[_author_key(item['author'])]
+            tag_ids = [self.tags[tag['slug']] for tag in item['tags']]
+            ingredients = [
+                [self.ingredients[(ingredient['name'],
+                                   ingredient['measurement_unit'])],
+                 ingredient['amount']]
+                for ingredient in item['ingredients']
+            ]
+            recipes.append(Recipe(
+                author_id=author[1],
+                name=item['name'],
+                text=item['text'],
+                cooking_time=item['cooking_time'],
+                image=item['image'],
+                image_renditions=item.get('renditions') or {},
+                snapshot={'author': author, 'tags': tag_ids,
+                          'ingredients': ingredients},
+            ))
+        bulk_insert_recipes(recipes)
+        self.created['recipes'] += len(recipes)
+
+    def finish(self):
+        clear_tag_cache()
+        clear_ingredient_cache()
+        for name in (RECIPES, RECIPE_ROWS, USERS, TAGS, INGREDIENTS):
+            bump_version(name)
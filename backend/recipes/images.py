@@ -0,0 +1,112 @@
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from jobs.queue import job
+from recipes.models import Recipe
+from recipes.versions import (RECIPE_ROWS, bump_version_on_commit,
+                              recipe_key)
+
+
+MAX_IMAGE_SIZE = 10 * 1024 * 1024
+MAX_IMAGE_DIMENSION = 6000
+IMAGE_FORMATS = {'JPEG': 'jpeg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+IMAGES_DIR = 'media'
+RENDITIONS_DIR = 'media/renditions'
+RENDITIONS = {
+    'thumb': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+RENDITION_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True,
+             'progressive': True},
+}
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def inspect_image(file):
+    if file.size > MAX_IMAGE_SIZE:
+        raise ValueError(f'Размер изображения не должен превышать '
+                         f'{MAX_IMAGE_SIZE // (1024 * 1024)} МБ')
+    file.seek(0)
+    try:
+        image = Image.open(file)
+        image_format, size = image.format, image.size
+        image.verify()
+    except Exception:
+        raise ValueError('Загрузите корректное изображение.')
+    finally:
+        file.seek(0)
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError('Неподдерживаемый формат изображения.')
+    if max(size) > MAX_IMAGE_DIMENSION:
+        raise ValueError(f'Стороны изображения не должны превышать '
+                         f'{MAX_IMAGE_DIMENSION} px')
+    return IMAGE_FORMATS[image_format]
+
+
+def store_image(file, ext, digest=None):
+    digest = digest or content_hash(file)
+    name = f'{IMAGES_DIR}/{digest[:2]}/{digest}.{ext}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, file)
+    return name
+
+
+def rendition_name(name, rendition, fmt):
+    stem = name.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+    return f'{RENDITIONS_DIR}/{rendition}/{stem}.{fmt}'
+
+
+def _encode(image, fmt):
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        image = image.convert('RGBA')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = io.BytesIO()
+    image.save(buffer, **RENDITION_FORMATS[fmt])
+    return ContentFile(buffer.getvalue())
+
+
+@job
+def make_renditions(name):
+    with default_storage.open(name) as file:
+        source = Image.open(file)
+        source.load()
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA')
+    renditions = {}
+    for rendition, size in RENDITIONS.items():
+        image = source.copy()
+        image.thumbnail(size)
+        renditions[rendition] = {}
+        for fmt in RENDITION_FORMATS:
+            target = rendition_name(name, rendition, fmt)
+            if not default_storage.exists(target):
+                target = default_storage.save(target, _encode(image, fmt))
+            renditions[rendition][fmt] = target
+    recipes = Recipe.objects.filter(image=name)
+    recipe_ids = list(recipes.values_list('id', flat=True))
+    recipes.update(image_renditions=renditions)
+    for recipe_id in recipe_ids:
+        bump_version_on_commit(recipe_key(recipe_id))
+    bump_version_on_commit(RECIPE_ROWS)
+    return renditions
+
+
+def schedule_renditions(name):
+    make_renditions.delay(name, dedup_key=f'renditions:{name}')
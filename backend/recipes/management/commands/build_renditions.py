@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from recipes.images import make_renditions
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+
+    def handle(self, *args, **options):
+        names = Recipe.objects.filter(image_renditions={}).exclude(
+            image='').values_list('image', flat=True).distinct()
+        for name in names.iterator():
+            try:
+                make_renditions(name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'{name}: {error}')
+
+        print('Готово!')
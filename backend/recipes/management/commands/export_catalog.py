@@ -0,0 +1,33 @@
+import sys
+
+import orjson
+from django.core.management import BaseCommand
+
+from recipes.catalog import CATALOG_BATCH_SIZE, export_catalog
+
+
+class Command(BaseCommand):
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-',
+                            help='Файл NDJSON, по умолчанию stdout.')
+        parser.add_argument('--batch-size', type=int,
+                            default=CATALOG_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            output = sys.stdout.buffer
+        else:
+            output = open(options['output'], 'wb')
+        count = 0
+        try:
+            for recipe in export_catalog(options['batch_size']):
+                output.write(orjson.dumps(recipe) + b'\n')
+                count += 1
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+            else:
+                output.flush()
+        print(f'Выгружено рецептов: {count}', file=sys.stderr)
+        print('Готово!', file=sys.stderr)
@@ -0,0 +1,62 @@
+import os
+
+import orjson
+from django.core.management import BaseCommand, CommandError
+
+from recipes.catalog import CATALOG_BATCH_SIZE, CatalogImporter
+
+
+class Command(BaseCommand):
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл NDJSON из export_catalog.')
+        parser.add_argument('--batch-size', type=int,
+                            default=CATALOG_BATCH_SIZE)
+        parser.add_argument('--checkpoint',
+                            help='Файл с позицией последней загруженной '
+                                 'пачки, по умолчанию <path>.checkpoint.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Начать сначала, игнорируя checkpoint.')
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint'] or f"{options['path']}.checkpoint"
+        state = {'offset': 0, 'line': 0}
+        if not options['restart'] and os.path.exists(checkpoint):
+            with open(checkpoint, 'rb') as file:
+                state = orjson.loads(file.read())
+            print(f"Продолжаю со строки {state['line'] + 1}")
+        importer = CatalogImporter()
+        with open(options['path'], 'rb') as source:
+            source.seek(state['offset'])
+            while True:
+                batch = []
+                while len(batch) < options['batch_size']:
+                    line = source.readline()
+                    if not line:
+                        break
+                    state['line'] += 1
+                    if not line.strip():
+                        continue
+                    try:
+                        batch.append(orjson.loads(line))
+                    except orjson.JSONDecodeError as error:
+                        raise CommandError(
+                            f"Строка {state['line']}: {error}")
+                if not batch:
+                    break
+                importer.import_batch(batch)
+                state['offset'] = source.tell()
+                self.save_checkpoint(checkpoint, state)
+                print(f"Загружено строк: {state['line']}")
+        importer.finish()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        print(', '.join(f'{name}: {count}'
+                        for name, count in importer.created.items()))
+        print('Готово!')
+
+    def save_checkpoint(self, path, state):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(orjson.dumps(state))
+        os.replace(tmp, path)
@@ -1,6 +1,6 @@
 import csv
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, call_command
 
 from recipes.models import Ingredient
 
@@ -19,3 +19,4 @@ class Command(BaseCommand):
                 ingredient.save()
 
         print('Загрузил!')
+        call_command('build_precompressed')
@@ -1,6 +1,6 @@
 import csv
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, call_command
 
 from recipes.models import Tag
 
@@ -21,3 +21,4 @@ class Command(BaseCommand):
                 tag.save()
 
         print('Загрузил!')
+        call_command('build_precompressed')
@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from recipes.models import Recipe
+from recipes.snapshots import SNAPSHOT_BATCH_SIZE, refresh_snapshots
+
+
+class Command(BaseCommand):
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Пересобрать и уже заполненные снимки.')
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.order_by('id')
+        if not options['all']:
+            recipes = recipes.filter(snapshot={})
+        last_id = 0
+        while True:
+            ids = list(recipes.filter(id__gt=last_id).values_list(
+                'id', flat=True)[:SNAPSHOT_BATCH_SIZE])
+            if not ids:
+                break
+            refresh_snapshots(ids)
+            last_id = ids[-1]
+
+        print('Готово!')
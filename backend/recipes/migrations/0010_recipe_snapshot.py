@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='snapshot',
+            field=models.JSONField(blank=True, default=dict, editable=False,
+                                   verbose_name='Снимок для чтения'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+INDEXES = {
+    'ingredient_name_prefix_idx': 'ingredient',
+    'recipe_name_prefix_idx': 'recipe',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, model_name in INDEXES.items():
+        table = apps.get_model('recipes', model_name)._meta.db_table
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} '
+            f'ON {schema_editor.quote_name(table)} '
+            f'(UPPER(name) text_pattern_ops)')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -65,6 +65,9 @@ class Recipe(models.Model):
                                verbose_name='Автор')
     name = models.CharField(max_length=200, verbose_name='Наименование')
     image = models.ImageField(upload_to='media/', verbose_name='Изображение')
+    image_renditions = models.JSONField(default=dict, blank=True,
+                                        editable=False,
+                                        verbose_name='Уменьшенные копии')
     text = models.CharField(max_length=2000, verbose_name='Текст')
     ingredients = models.ManyToManyField(Ingredient,
                                          through='RecipeIngredient',
@@ -78,10 +81,19 @@ class Recipe(models.Model):
         validators=[validate_cooking_time])
     pub_date = models.DateTimeField(auto_now=True,
                                     verbose_name='Дата публикации')
+    snapshot = models.JSONField(default=dict, blank=True, editable=False,
+                                verbose_name='Снимок для чтения')
+    is_hidden = models.BooleanField(default=False, editable=False,
+                                    verbose_name='Скрыт до удаления')
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [models.Index(fields=['-pub_date'],
+                                name='recipe_pub_date_idx'),
+                   models.Index(fields=['id'],
+                                condition=models.Q(is_hidden=True),
+                                name='recipe_hidden_idx')]
 
     def __str__(self):
         return self.name
@@ -0,0 +1,41 @@
+from jobs.queue import job
+from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from recipes.versions import RECIPE_ROWS, RECIPES, bump_version_on_commit
+
+
+PURGE_BATCH_SIZE = 500
+
+
+def delete_in_batches(queryset):
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:PURGE_BATCH_SIZE])
+        if not pks:
+            return
+        queryset.model.objects.filter(pk__in=pks).delete()
+
+
+def hide_recipes(queryset):
+    recipe_ids = list(queryset.filter(is_hidden=False).values_list(
+        'id', flat=True))
+    if not recipe_ids:
+        return
+    Recipe.objects.filter(id__in=recipe_ids).update(is_hidden=True)
+    bump_version_on_commit(RECIPES)
+    bump_version_on_commit(RECIPE_ROWS)
+    purge_hidden_recipes.delay(dedup_key='purge_hidden_recipes')
+
+
+def purge_recipes(recipe_ids):
+    for model in (Favorite, ShoppingCart, RecipeIngredient,
+                  Recipe.tags.through):
+        delete_in_batches(model.objects.filter(recipe_id__in=recipe_ids))
+    Recipe.objects.filter(id__in=recipe_ids).delete()
+
+
+@job
+def purge_hidden_recipes():
+    recipe_ids = list(Recipe.objects.filter(is_hidden=True).values_list(
+        'id', flat=True)[:PURGE_BATCH_SIZE])
+    if recipe_ids:
+        purge_recipes(recipe_ids)
+        purge_hidden_recipes.delay(dedup_key='purge_hidden_recipes')
@@ -0,0 +1,73 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.db import transaction
+from django.dispatch import receiver
+
+from recipes.cache import clear_ingredient_cache, clear_tag_cache
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from recipes.snapshots import refresh_snapshots, refresh_snapshots_on_commit
+from recipes.versions import (INGREDIENTS, RECIPE_ROWS, RECIPES, TAGS,
+                              bump_version_on_commit, recipe_key)
+from recipes.viewer import CART, FAVORITES, update_viewer_context
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def reference_deleting(sender, instance, **kwargs):
+    instance.snapshot_recipe_ids = list(
+        instance.recipes.values_list('id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    transaction.on_commit(clear_tag_cache)
+    bump_version_on_commit(TAGS)
+    refresh_snapshots(getattr(instance, 'snapshot_recipe_ids', []))
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    transaction.on_commit(clear_ingredient_cache)
+    bump_version_on_commit(INGREDIENTS)
+    refresh_snapshots(getattr(instance, 'snapshot_recipe_ids', []))
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def recipe_changed(sender, instance, created=True, **kwargs):
+    if created:
+        bump_version_on_commit(RECIPES)
+    if kwargs['signal'] is post_save:
+        refresh_snapshots_on_commit([instance.pk])
+    else:
+        bump_version_on_commit(recipe_key(instance.pk))
+        bump_version_on_commit(RECIPE_ROWS)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, pk_set=None, **kwargs):
+    if not action.startswith('post_'):
+        return
+    recipe_ids = ([instance.pk] if isinstance(instance, Recipe)
+                  else list(pk_set or ()))
+    bump_version_on_commit(RECIPES)
+    refresh_snapshots_on_commit(recipe_ids)
+
+
+@receiver([post_save, post_delete], sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    refresh_snapshots_on_commit([instance.recipe_id])
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+def favorite_changed(sender, instance, created=False, **kwargs):
+    if created or kwargs['signal'] is post_delete:
+        update_viewer_context(instance.user_id, FAVORITES,
+                              instance.recipe_id, add=created)
+
+
+@receiver([post_save, post_delete], sender=ShoppingCart)
+def cart_changed(sender, instance, created=False, **kwargs):
+    if created or kwargs['signal'] is post_delete:
+        update_viewer_context(instance.user_id, CART,
+                              instance.recipe_id, add=created)
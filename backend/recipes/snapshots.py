@@ -0,0 +1,65 @@
+import threading
+
+from django.db import transaction
+
+from recipes.models import Recipe, RecipeIngredient
+from recipes.versions import (RECIPE_ROWS, bump_version_on_commit,
+                              recipe_key)
+
+
+SNAPSHOT_BATCH_SIZE = 500
+
+_pending = threading.local()
+AUTHOR_VALUES = ('author__email', 'author_id', 'author__username',
+                 'author__first_name', 'author__last_name')
+
+
+def build_snapshots(recipe_ids):
+    snapshots = {
+        recipe_id: {'author': list(author), 'tags': [], 'ingredients': []}
+        for recipe_id, *author in Recipe.objects.filter(
+            id__in=recipe_ids).values_list('id', *AUTHOR_VALUES)
+    }
+    tags = Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids).order_by('pk').values_list(
+            'recipe_id', 'tag_id')
+    for recipe_id, tag_id in tags:
+        snapshots[recipe_id]['tags'].append(tag_id)
+    ingredients = RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids).order_by('pk').values_list(
+            'recipe_id', 'ingredient_id', 'amount')
+    for recipe_id, ingredient_id, amount in ingredients:
+        snapshots[recipe_id]['ingredients'].append([ingredient_id, amount])
+    return snapshots
+
+
+def refresh_snapshots(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    result = {}
+    for start in range(0, len(recipe_ids), SNAPSHOT_BATCH_SIZE):
+        snapshots = build_snapshots(
+            recipe_ids[start:start + SNAPSHOT_BATCH_SIZE])
+        Recipe.objects.bulk_update(
+            [Recipe(id=recipe_id, snapshot=snapshot)
+             for recipe_id, snapshot in snapshots.items()],
+            ['snapshot'])
+        result.update(snapshots)
+    for recipe_id in result:
+        bump_version_on_commit(recipe_key(recipe_id))
+    if result:
+        bump_version_on_commit(RECIPE_ROWS)
+    return result
+
+
+def _refresh_pending():
+    recipe_ids = getattr(_pending, 'ids', set())
+    _pending.ids = set()
+    if recipe_ids:
+        refresh_snapshots(sorted(recipe_ids))
+
+
+def refresh_snapshots_on_commit(recipe_ids):
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids.update(recipe_ids)
+    transaction.on_commit(_refresh_pending)
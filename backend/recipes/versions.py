@@ -0,0 +1,48 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+TAGS = 'tags'
+INGREDIENTS = 'ingredients'
+RECIPES = 'recipes'
+RECIPE_ROWS = 'recipe_rows'
+USERS = 'users'
+
+
+def recipe_key(recipe_id):
+    return f'recipe:{recipe_id}'
+
+
+def profile_key(user_id):
+    return f'profile:{user_id}'
+
+
+def viewer_key(user_id):
+    return f'viewer:{user_id}'
+
+
+def _cache_key(name):
+    return f'version:{name}'
+
+
+def bump_version(name):
+    version = time.time()
+    cache.set(_cache_key(name), version, None)
+    return version
+
+
+def bump_version_on_commit(name):
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def get_versions(*names):
+    cached = cache.get_many([_cache_key(name) for name in names])
+    versions = []
+    for name in names:
+        version = cached.get(_cache_key(name))
+        if version is None:
+            version = bump_version(name)
+        versions.append(version)
+    return versions
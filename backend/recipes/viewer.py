@@ -0,0 +1,82 @@
+import bisect
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from recipes.models import Favorite, ShoppingCart
+from recipes.versions import bump_version, viewer_key
+from users.models import Follow
+
+
+FAVORITES = 'favorites'
+CART = 'cart'
+FOLLOWS = 'follows'
+VIEWER_CONTEXT_TIMEOUT = 24 * 60 * 60
+
+
+def _context_key(user_id):
+    return f'viewer_context:{user_id}'
+
+
+def _counter_key(user_id):
+    return f'viewer_context_version:{user_id}'
+
+
+def _current_version(user_id):
+    version = cache.get(_counter_key(user_id))
+    if version is None:
+        cache.add(_counter_key(user_id), int(time.time() * 1000), None)
+        version = cache.get(_counter_key(user_id))
+    return version
+
+
+def _load(user_id):
+    return {
+        FAVORITES: sorted(Favorite.objects.filter(
+            user_id=user_id).values_list('recipe_id', flat=True)),
+        CART: sorted(ShoppingCart.objects.filter(
+            user_id=user_id).values_list('recipe_id', flat=True)),
+        FOLLOWS: sorted(Follow.objects.filter(
+            user_id=user_id).values_list('author_id', flat=True)),
+    }
+
+
+def get_viewer_context(user):
+    if user.is_anonymous:
+        return {FAVORITES: set(), CART: set(), FOLLOWS: set()}
+    if not hasattr(user, '_viewer_context'):
+        version = _current_version(user.pk)
+        entry = cache.get(_context_key(user.pk))
+        if entry is None or entry['version'] != version:
+            entry = {'version': version, **_load(user.pk)}
+            cache.set(_context_key(user.pk), entry, VIEWER_CONTEXT_TIMEOUT)
+        user._viewer_context = {name: set(entry[name])
+                                for name in (FAVORITES, CART, FOLLOWS)}
+    return user._viewer_context
+
+
+def update_viewer_context(user_id, name, object_id, add):
+    transaction.on_commit(
+        lambda: _apply_viewer_change(user_id, name, object_id, add))
+
+
+def _apply_viewer_change(user_id, name, object_id, add):
+    bump_version(viewer_key(user_id))
+    entry = cache.get(_context_key(user_id))
+    try:
+        version = cache.incr(_counter_key(user_id))
+    except ValueError:
+        cache.delete(_context_key(user_id))
+        return
+    if entry is None or entry['version'] != version - 1:
+        return
+    ids = entry[name]
+    index = bisect.bisect_left(ids, object_id)
+    present = index < len(ids) and ids[index] == object_id
+    if add and not present:
+        ids.insert(index, object_id)
+    elif not add and present:
+        del ids[index]
+    entry['version'] = version
+    cache.set(_context_key(user_id), entry, VIEWER_CONTEXT_TIMEOUT)
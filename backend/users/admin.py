@@ -1,9 +1,45 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
 
 from . import models
+from users.purge import hide_user
+
+
+User = get_user_model()
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class FoodgramUserAdmin(UserAdmin):
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(deletion__isnull=True)
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        hide_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            hide_user(user)
 
 
 @admin.register(models.Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ['user', 'author']
     search_fields = ['user__first_name', 'user__last_name', 'user__username']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(
+            user__deletion__isnull=True, author__deletion__isnull=True)
+
+
+@admin.register(models.DeletedUser)
+class DeletedUserAdmin(admin.ModelAdmin):
+    list_display = ['user', 'deleted_at']
+    list_select_related = ['user']
+    search_fields = ['^user__username', '^user__email']
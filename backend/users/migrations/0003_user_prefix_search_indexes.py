@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import migrations
+
+
+INDEXES = {
+    'user_username_prefix_idx': 'username',
+    'user_email_prefix_idx': 'email',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} '
+            f'ON {schema_editor.quote_name(table)} '
+            f'(UPPER({column}) text_pattern_ops)')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0002_auto_20230905_0156'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -30,3 +30,22 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user.username} подписан на {self.author.username}'
+
+
+class DeletedUser(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion',
+        verbose_name='Пользователь'
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Дата удаления')
+
+    class Meta:
+        verbose_name = 'Удалённый пользователь'
+        verbose_name_plural = 'Удалённые пользователи'
+
+    def __str__(self):
+        return f'{self.user.username} удалён {self.deleted_at:%d.%m.%Y}'
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from jobs.queue import job
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.purge import (PURGE_BATCH_SIZE, delete_in_batches, hide_recipes,
+                           purge_recipes)
+from recipes.versions import USERS, bump_version_on_commit, profile_key
+from users.models import DeletedUser, Follow
+
+
+User = get_user_model()
+
+
+@transaction.atomic
+def hide_user(user):
+    DeletedUser.objects.get_or_create(user=user)
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    hide_recipes(Recipe.objects.filter(author=user))
+    bump_version_on_commit(profile_key(user.pk))
+    bump_version_on_commit(USERS)
+    purge_user.delay(user.pk, dedup_key=f'purge_user:{user.pk}')
+
+
+@job
+def purge_user(user_id):
+    if not DeletedUser.objects.filter(user_id=user_id).exists():
+        return
+    recipe_ids = list(Recipe.objects.filter(author_id=user_id).values_list(
+        'id', flat=True)[:PURGE_BATCH_SIZE])
+    if recipe_ids:
+        purge_recipes(recipe_ids)
+        purge_user.delay(user_id, dedup_key=f'purge_user:{user_id}')
+        return
+    for queryset in (
+            Favorite.objects.filter(user_id=user_id),
+            ShoppingCart.objects.filter(user_id=user_id),
+            Follow.objects.filter(Q(user_id=user_id) | Q(author_id=user_id))):
+        delete_in_batches(queryset)
+    User.objects.filter(pk=user_id, deletion__isnull=False).delete()
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from recipes.snapshots import refresh_snapshots_on_commit
+from recipes.versions import USERS, bump_version_on_commit, profile_key
+from recipes.viewer import FOLLOWS, update_viewer_context
+from users.models import Follow
+
+
+User = get_user_model()
+
+SNAPSHOT_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+@receiver(pre_save, sender=User)
+def profile_saving(sender, instance, update_fields=None, **kwargs):
+    fields = SNAPSHOT_FIELDS if update_fields is None else (
+        SNAPSHOT_FIELDS & set(update_fields))
+    old = None
+    if instance.pk is not None and fields:
+        old = User.objects.filter(pk=instance.pk).values(*fields).first()
+    instance.snapshot_changed = old is not None and any(
+        old[field] != getattr(instance, field) for field in fields)
+
+
+@receiver(post_save, sender=User)
+def profile_changed(sender, instance, created, **kwargs):
+    bump_version_on_commit(profile_key(instance.pk))
+    if created:
+        bump_version_on_commit(USERS)
+    if getattr(instance, 'snapshot_changed', False):
+        refresh_snapshots_on_commit(
+            instance.recipes.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_version_on_commit(profile_key(instance.pk))
+    bump_version_on_commit(USERS)
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def follow_changed(sender, instance, created=False, **kwargs):
+    if created or kwargs['signal'] is post_delete:
+        update_viewer_context(instance.user_id, FOLLOWS,
+                              instance.author_id, add=created)